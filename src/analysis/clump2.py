@@ -32,9 +32,7 @@ def main(opts: Options):
 
     regsdb = get_nonvoid_regions(Config.names)
     validation_set = set(regsdb) & get_bonnie_coords(Config.bonnie)
-    for co in list(map_tiles.keys()):
-        if co not in validation_set:
-            del map_tiles[co]
+    map_tiles = {co: fp for co, fp in map_tiles.items() if co in validation_set}
 
     # all_coords = set(map_tiles.keys())
     all_coords = validation_set
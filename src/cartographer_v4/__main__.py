@@ -4,14 +4,21 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
+import functools
+import multiprocessing as MP
+import os
 import re
+import signal
+import sys
 import time
 from datetime import datetime
 from fnmatch import fnmatch
-from itertools import chain
+from itertools import chain, combinations
 from multiprocessing import Event
+from multiprocessing.pool import ThreadPool
 from pathlib import Path
-from typing import Final, Protocol, cast
+from typing import TYPE_CHECKING, Final, Protocol, cast
 
 from PIL import Image
 
@@ -24,12 +31,27 @@ from sl_maptools import (
     inventorize_maps_latest,
 )
 from sl_maptools.config import DefaultConfig as Config
-from sl_maptools.knowns import KNOWN_AREAS
-from sl_maptools.utils import handle_sigint, make_pnginfo
+from sl_maptools.knowns import KNOWN_AREAS, KNOWN_AREAS_CASEFOLDED
+from sl_maptools.utils import handle_sigint, image_pixel_limit, make_pnginfo
 from sl_maptools.validator import get_bonnie_coords, get_nonvoid_regions
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from multiprocessing.pool import AsyncResult
+
+# Serial by default: every worker holds a full-resolution canvas (plus its own tile cache), so parallel is opt-in
+DEFA_WORKERS: Final[int] = 1
+TILE_LOADERS: Final[int] = min(8, MP.cpu_count())
+TILE_CACHE_SIZE: Final[int] = 1024
+
 AbortRequested: SupportsSet = Event()
 
+# Set up by make_map_init() in each worker process
+MapTiles: dict[CoordType, Path] = {}
+ValidationSet: set[CoordType] = set()
+Exclusion: ExclusionMethod = ExclusionMethod.HIDE
+CacheTiles: bool = False
+
 
 class CartographerOptions(Protocol):
     """
@@ -42,6 +64,7 @@ class CartographerOptions(Protocol):
     overwrite: bool
     exclusion_method: ExclusionMethod
     no_bonnie: bool
+    workers: int
 
 
 class Options(CartographerOptions, Protocol):
@@ -58,6 +81,7 @@ class AreaParser(argparse.Action):
     """
 
     RE_AREA: Final[re.Pattern] = re.compile(r"(?P<x1>\d+)[,:-](?P<y1>\d+)[,:-](?P<x2>\d+)[,:-](?P<y2>\d+)")
+    SEPS_TO_COMMA: Final[dict[int, str]] = str.maketrans(":-", ",,")
 
     def __call__(self, parser, namespace, values, option_string=None):  # noqa: ANN001, ARG002
         """
@@ -69,14 +93,20 @@ class AreaParser(argparse.Action):
         :param option_string: Options
         """
         re_area = self.RE_AREA
+        seps_to_comma = self.SEPS_TO_COMMA
         rslt = []
         for value in values:
             try:
-                m = re_area.match(value)
-                x1 = int(m.group("x1"))
-                y1 = int(m.group("y1"))
-                x2 = int(m.group("x2"))
-                y2 = int(m.group("y2"))
+                # Fast path for the plain 'x1,y1-x2,y2' form; anything else goes through the regex
+                parts = value.translate(seps_to_comma).split(",")
+                if len(parts) == 4 and all(p.isdecimal() for p in parts):  # noqa: PLR2004
+                    x1, y1, x2, y2 = map(int, parts)
+                else:
+                    m = re_area.match(value)
+                    x1 = int(m.group("x1"))
+                    y1 = int(m.group("y1"))
+                    x2 = int(m.group("x2"))
+                    y2 = int(m.group("y2"))
                 if x2 < x1:
                     x1, x2 = x2, x1
                 if y2 < y1:
@@ -143,11 +173,87 @@ def _get_options() -> Options:
         default=False,
         help="If specified, do not perform validation against BonnieBots database",
     )
+    parser.add_argument(
+        "--workers",
+        metavar="N",
+        type=int,
+        default=DEFA_WORKERS,
+        help=(
+            "Number of maps to make in parallel. Every worker holds a full-resolution canvas and its own tile cache in "
+            "memory, so only raise this if there is memory to spare. (Default: %(default)s)"
+        ),
+    )
 
     _opts: Options = cast(Options, parser.parse_args())
     return _opts
 
 
+def _decode_tile(fpath: Path) -> Image.Image:
+    """Open & decode one map tile as RGBA"""
+    with Image.open(fpath) as img:
+        if img.mode == "RGBA":
+            # Already what we need; convert() would just make a copy of the freshly-decoded pixels
+            img.load()
+            return img
+        # Convert here, in the loader thread, so the paste onto the RGBA canvas is a straight same-mode copy instead of
+        # an implicit per-tile convert() on the pasting thread
+        return img.convert("RGBA")
+
+
+# Overlapping areas use many of the same tiles; the cached images are shared, so they must never be modified in place
+_decode_tile_cached: Final = functools.lru_cache(maxsize=TILE_CACHE_SIZE)(_decode_tile)
+
+
+def _load_tile(job: tuple[int, int, Path, bool, bool]) -> tuple[int, int, Image.Image]:
+    """Get one map tile as RGBA, making it semi-transparent if requested"""
+    canv_x, canv_y, fpath, make_transp, cached = job
+    if not cached:
+        rgba = _decode_tile(fpath)
+        if make_transp:
+            rgba.putalpha(63)
+    else:
+        rgba = _decode_tile_cached(fpath)
+        if make_transp:
+            rgba = rgba.copy()
+            rgba.putalpha(63)
+    return canv_x, canv_y, rgba
+
+
+def select_tiles(
+    area: AreaDescriptor,
+    map_tiles: dict[CoordType, Path],
+    validation_set: set[CoordType],
+    exclusion_method: ExclusionMethod,
+) -> list[CoordType]:
+    """
+    Returns the coordinates of the tiles to draw for an area, top-to-bottom and left-to-right (the canvas' row order)
+    """
+    # Narrow down using set operations, rather than testing every coordinate of the area one by one; most of a big
+    # area is usually empty
+    if exclusion_method is ExclusionMethod.HIDE:
+        coords = map_tiles.keys() & area.to_coords()
+    else:
+        coords = map_tiles.keys() & area.bounding_box.xy_iterator()
+    if area.validate:
+        coords &= validation_set
+    return sorted(coords, key=lambda xy: (-xy[1], xy[0]))
+
+
+def prefetch_tiles(tile_paths: list[Path]) -> None:
+    """Ask the OS to start reading tile files into the page cache. Does nothing where unsupported."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for fpath in tile_paths:
+        if AbortRequested.is_set():
+            return
+        with contextlib.suppress(OSError):
+            fd = os.open(fpath, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+
+
 def make_map(
     targ: Path,
     area: AreaDescriptor,
@@ -156,46 +262,81 @@ def make_map(
     exclusion_method: ExclusionMethod,
     *,
     add_info: bool = True,
+    quiet: bool = False,
+    cache_tiles: bool = False,
+    coords: list[CoordType] | None = None,
 ) -> int:
     """
     Actually create the map file
+
+    :param cache_tiles: Keep decoded tiles around for other maps; only worth it if the areas overlap
+    :param coords: The area's tiles, if already picked by select_tiles()
     """
-    print(f"{area.bounding_box}", end="", flush=True)
+    if not quiet:
+        print(f"{area.bounding_box}", end="", flush=True)
     csize_x = (area.x_eastmost - area.x_westmost + 1) * 256
     csize_y = (area.y_northmost - area.y_southmost + 1) * 256
     canvas = Image.new("RGBA", (csize_x, csize_y))
 
-    if exclusion_method is ExclusionMethod.HIDE:  # noqa: SIM108
-        xy_iterator = area.xy_iterator
-    else:
-        xy_iterator = area.bounding_box.xy_iterator
+    transp = exclusion_method is ExclusionMethod.TRANSP
+    west = area.x_westmost
+    north = area.y_northmost
+    if coords is None:
+        coords = select_tiles(area, map_tiles, validation_set, exclusion_method)
+    tile_jobs: list[tuple[int, int, Path, bool, bool]] = [
+        ((x - west) * 256, (north - y) * 256, map_tiles[x, y], transp and (x, y) not in area, cache_tiles)
+        for x, y in coords
+    ]
 
     c = 0
-    validate = area.validate
-    for x, y in xy_iterator():
-        # print(coord)
-        if (x, y) not in map_tiles:
-            continue
-        if validate and (x, y) not in validation_set:
-            continue
-        c += 1
-        if (c % 40) == 0:
-            print(".", end="", flush=True)
-        canv_x = (x - area.x_westmost) * 256
-        canv_y = (area.y_northmost - y) * 256
-        with Image.open(map_tiles[x, y]) as img:
-            img.load()
-            if exclusion_method is ExclusionMethod.TRANSP and (x, y) not in area:
-                img.putalpha(63)
-            canvas.paste(img, (canv_x, canv_y))
+    if tile_jobs:
+        # Decoding the tiles is the expensive part, and Pillow releases the GIL while decoding, so a few threads keep
+        # the cores busy. Pasting stays in this thread; tiles never overlap, so the order they arrive in is irrelevant.
+        with ThreadPool(min(TILE_LOADERS, len(tile_jobs))) as pool:
+            for canv_x, canv_y, img in pool.imap_unordered(_load_tile, tile_jobs):
+                c += 1
+                if not quiet and (c % 40) == 0:
+                    print(".", end="", flush=True)
+                canvas.paste(img, (canv_x, canv_y))
 
     # print(targ)
     info = make_pnginfo(area.name, f"High-resolution map of {area.name}", Config.info) if add_info else None
-    canvas.save(targ, optimize=True, pnginfo=info)
+    # Saved under a temporary name and only moved into place once complete: an interrupted save (e.g., a worker
+    # terminated on abort) must not leave a truncated map that the next run would skip as "Already exists"
+    tmp_targ = targ.with_name(targ.name + ".tmp")
+    try:
+        canvas.save(tmp_targ, format="PNG", optimize=True, pnginfo=info)
+    except BaseException:
+        tmp_targ.unlink(missing_ok=True)
+        raise
+    tmp_targ.replace(targ)
 
     return c
 
 
+def make_map_init(
+    map_tiles: dict[CoordType, Path],
+    validation_set: set[CoordType],
+    exclusion_method: ExclusionMethod,
+    cache_tiles: bool,
+) -> None:
+    """Initializer for map-making workers; the big lookup tables are sent once per worker instead of once per job"""
+    global MapTiles, ValidationSet, Exclusion, CacheTiles  # noqa: PLW0603
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    MapTiles = map_tiles
+    ValidationSet = validation_set
+    Exclusion = exclusion_method
+    CacheTiles = cache_tiles
+
+
+def make_map_job(job: tuple[str, Path, AreaDescriptor]) -> tuple[str, Path, AreaDescriptor, int]:
+    """A worker that makes one area's map"""
+    area_name, targ, area_desc = job
+    return area_name, targ, area_desc, make_map(
+        targ, area_desc, MapTiles, ValidationSet, Exclusion, quiet=True, cache_tiles=CacheTiles
+    )
+
+
 def main(opts: Options) -> None:  # noqa: D103
     start = time.monotonic()
 
@@ -211,14 +352,13 @@ def main(opts: Options) -> None:  # noqa: D103
             wanted_areas.append((aname, AreaDescriptor(includes=a)))
 
     if opts.continents:
-        known_folded = {a.casefold(): a for a in KNOWN_AREAS}
+        known_folded = KNOWN_AREAS_CASEFOLDED
         want: str
         for want in chain.from_iterable(s.split(",") for s in opts.continents):
             if kn := known_folded.get(want := want.casefold()):
                 wanted_areas.append((kn, KNOWN_AREAS[kn]))
             else:
                 wanted_areas.extend((kn, KNOWN_AREAS[kn]) for knf, kn in known_folded.items() if fnmatch(knf, want))
-        del known_folded
 
     regsdb = get_nonvoid_regions(Config.names)
     validation_set: set[CoordType] = set(regsdb)
@@ -231,30 +371,101 @@ def main(opts: Options) -> None:  # noqa: D103
 
     print("\nMaking maps:")
     new_count = 0
-    with handle_sigint(AbortRequested):
-        Image.MAX_IMAGE_PIXELS = None
+    with handle_sigint(AbortRequested), contextlib.ExitStack() as stack:
         if not opts.no_lattice:
             maker = LatticeMaker(
                 regions_db=regsdb, validation_set=validation_set, exclusion_method=opts.exclusion_method
             )
+
+        def _make_lattice(_targ: Path, _desc: AreaDescriptor) -> None:
+            # Area maps are far beyond PIL's decompression-bomb limit; lift it just enough for this map, and only
+            # while the lattice maker has it open
+            bbox = _desc.bounding_box
+            with image_pixel_limit(bbox.width * bbox.height * 256 * 256):
+                maker.make_lattice(_targ, validate=_desc.validate, overwrite=opts.overwrite)
+
+        jobs: list[tuple[str, Path, AreaDescriptor]] = []
         for area_name, area_desc in wanted_areas:
             targdir = Path(Config.areas.dir) / (area_desc.target_dir or area_name)
             targdir.mkdir(parents=True, exist_ok=True)
-            print(f"{area_name}: ", end="", flush=True)
             targ = targdir / (area_name + ".png")
-            if not opts.overwrite and targ.exists():
-                print(f"Already exists\n  => {targ}")
+            if opts.overwrite or not targ.exists():
+                jobs.append((area_name, targ, area_desc))
+                continue
+            print(f"{area_name}: Already exists\n  => {targ}")
+            if not opts.no_lattice:
+                _make_lattice(targ, area_desc)
+                print()
+            if AbortRequested.is_set():
+                jobs.clear()
+                break
+
+        # Caching decoded tiles only pays off if some tiles are going to be used more than once
+        cache_tiles = any(a & b for a, b in combinations((_desc.bounding_box for _, _, _desc in jobs), 2))
+
+        def _make_serially() -> Iterable[tuple[str, Path, AreaDescriptor, int]]:
+            # While one map is being made (and especially while its PNG is being compressed, which is single-threaded)
+            # the next map's tiles are read ahead in the background. Each map's tiles are picked only once, and shared
+            # by the prefetcher and make_map().
+            prefetcher = stack.enter_context(ThreadPool(1))
+            prefetched: AsyncResult | None = None
+            coords = select_tiles(jobs[0][2], map_tiles, validation_set, opts.exclusion_method) if jobs else []
+            for i, (_name, _targ, _desc) in enumerate(jobs, start=1):
+                if prefetched is not None:
+                    # Reading ahead is only a speedup, so a failure is reported but doesn't stop the maps being made
+                    try:
+                        prefetched.get()
+                    except Exception as e:  # pylint: disable=broad-exception-caught
+                        print(f"WARN: Prefetching tiles for {_name} failed: {e!r}", file=sys.stderr, flush=True)
+                    prefetched = None
+                next_coords: list[CoordType] = []
+                if i < len(jobs):
+                    next_coords = select_tiles(jobs[i][2], map_tiles, validation_set, opts.exclusion_method)
+                    prefetched = prefetcher.apply_async(prefetch_tiles, ([map_tiles[xy] for xy in next_coords],))
+                print(f"{_name}: 🌐", end="", flush=True)
+                yield _name, _targ, _desc, make_map(
+                    _targ,
+                    _desc,
+                    map_tiles,
+                    validation_set,
+                    opts.exclusion_method,
+                    cache_tiles=cache_tiles,
+                    coords=coords,
+                )
+                coords = next_coords
+
+        # Every map is independent of the others, so they can be made side by side. Lattices are still drawn here,
+        # one by one, as each map comes back.
+        parallel = opts.workers > 1 and len(jobs) > 1
+        if parallel:
+            workers = min(opts.workers, len(jobs))
+            print(f"Making {len(jobs)} maps with {workers} workers ...", flush=True)
+            # On abort, leaving the with-block terminates the pool; a map whose worker gets killed mid-save is lost,
+            # but never left behind half-written (see make_map())
+            pool = stack.enter_context(
+                MP.Pool(
+                    workers,
+                    initializer=make_map_init,
+                    initargs=(map_tiles, validation_set, opts.exclusion_method, cache_tiles),
+                )
+            )
+            results = pool.imap_unordered(make_map_job, jobs)
+        else:
+            results = _make_serially()
+
+        for area_name, targ, area_desc, tiles in results:
+            new_count += 1
+            if parallel:
+                print(f"{area_name}: 🌐 [{tiles}] {targ}", flush=True)
             else:
-                print("🌐", end="", flush=True)
-                tiles = make_map(targ, area_desc, map_tiles, validation_set, opts.exclusion_method)
-                new_count += 1
                 print(f"\n  => [{tiles}] {targ}", flush=True)
             if not opts.no_lattice:
-                maker.make_lattice(targ, validate=area_desc.validate, overwrite=opts.overwrite)
+                _make_lattice(targ, area_desc)
                 print()
             if AbortRequested.is_set():
                 break
 
+    _decode_tile_cached.cache_clear()
     finish = time.monotonic()
     print("=" * 40)
     print(f"{len(wanted_areas)} areas processed, {new_count} new")
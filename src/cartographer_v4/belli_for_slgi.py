@@ -145,25 +145,21 @@ def main(opts: Options) -> None:  # noqa: D103
     with StringIO(BELLI_EXCLUSIONS_YAML) as fin:
         data: dict[str, list[str]] = YAML(typ="safe").load(fin)
 
-    print("Creating base ... ", end="", flush=True)
-    canvas_base = Image.new("RGBA", (belli_width, belli_height))
-    img_tiles: dict[tuple[int, int], Image] = {}
-    for xy in belli_coords:
-        if xy not in map_tiles or xy not in bonnie_coords:
-            continue
+    # Every tile is kept both as-is and faded, so each map is assembled in a single pass over the tiles rather than by
+    # copying a whole faded base canvas and then pasting the non-excluded tiles over it
+    print("Loading tiles ... ", end="", flush=True)
+    westmost = belli_all.x_westmost
+    nordmost = belli_all.y_northmost
+    img_tiles: dict[CoordType, tuple[tuple[int, int], Image.Image, Image.Image]] = {}
+    for xy in belli_coords & map_tiles.keys() & bonnie_coords:
         x, y = xy
-        canv_x = (x - belli_all.x_westmost) * 256
-        canv_y = (belli_all.y_northmost - y) * 256
         with Image.open(map_tiles[x, y]) as img:
-            img.load()
-            img_tiles[x, y] = img.copy()
-            img.putalpha(63)
-            canvas_base.paste(img, (canv_x, canv_y))
-    del img
+            tile = img.convert("RGBA")
+        faded = tile.copy()
+        faded.putalpha(63)
+        img_tiles[xy] = ((x - westmost) * 256, (nordmost - y) * 256), tile, faded
     print(f"{len(img_tiles)} tiles", flush=True)
 
-    westmost = belli_all.x_westmost
-    nordmost = belli_all.y_northmost
     for mapname, excludes in data.items():
         targ: Path = Path(Config.areas.dir) / f"{mapname}.png"
         if not opts.overwrite and targ.exists():
@@ -171,16 +167,10 @@ def main(opts: Options) -> None:  # noqa: D103
             continue
         print(f"Generating {mapname} ... ", end="", flush=True)
         exc = AreaBoundsSet(AreaBounds.from_slgi(e) for e in excludes)
-        canvas = canvas_base.copy()
-
-        for xy in belli_coords:
-            if xy not in img_tiles:
-                continue
-            if xy in exc:
-                continue
-            canv_x = (xy[0] - westmost) * 256
-            canv_y = (nordmost - xy[1]) * 256
-            canvas.paste(img_tiles[xy], (canv_x, canv_y))
+        canvas = Image.new("RGBA", (belli_width, belli_height))
+
+        for xy, (canv_xy, tile, faded) in img_tiles.items():
+            canvas.paste(faded if xy in exc else tile, canv_xy)
 
         print(f"saving {targ} ... ", end="", flush=True)
         canvas.save(targ)
@@ -11,7 +11,7 @@ from PIL import Image
 
 from cartographer_v4.lattice import LatticeMaker
 from sl_maptools.config import DefaultConfig as Config
-from sl_maptools.knowns import KNOWN_AREAS
+from sl_maptools.knowns import KNOWN_AREAS_CASEFOLDED
 from sl_maptools.validator import get_bonnie_coords, get_nonvoid_regions
 
 DB_PATH: Final[Path] = Path(Config.names.dir) / Config.names.db
@@ -58,7 +58,7 @@ def main(opts: Options) -> None:  # noqa: D103
 
     want_areas: set[Path]
     if opts.areas:
-        cs_anames = {k.casefold(): k for k in KNOWN_AREAS}
+        cs_anames = KNOWN_AREAS_CASEFOLDED
         # noinspection PyTypeChecker
         want_areas = {
             (areamaps_dir / cs_anames[a1]).with_suffix(".png")
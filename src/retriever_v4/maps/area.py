@@ -14,10 +14,10 @@ from typing import TYPE_CHECKING, NamedTuple, cast
 
 import httpx
 
-from sl_maptools import RE_SLGI_NOTATION, AreaDescriptor, MapCoord
+from sl_maptools import RE_SLGI_NOTATION, MapCoord
 from sl_maptools.config import DefaultConfig as Config
 from sl_maptools.fetchers.map import MapFetcher
-from sl_maptools.knowns import KNOWN_AREAS
+from sl_maptools.knowns import KNOWN_AREAS, KNOWN_AREAS_CASEFOLDED
 
 if TYPE_CHECKING:
     from sl_maptools.fetchers import RawResult
@@ -74,8 +74,6 @@ async def aretrieve(wants: dict[str, list[tuple[int, int, int, int]]]) -> None:
 
 
 def main(opts: Options) -> None:  # noqa: D103
-    known_folded: dict[str, AreaDescriptor] = {k.casefold(): desc for k, desc in KNOWN_AREAS.items()}
-
     wants: dict[str, list[tuple[int, int, int, int]]] = {}
 
     for want in opts.area:
@@ -88,11 +86,12 @@ def main(opts: Options) -> None:  # noqa: D103
             x1, y1, x2, y2 = m.groups()
             wants[want] = [x1, y1, x2, y2]
             continue
-        if (area_desc := known_folded.get(want.casefold())) is not None:
-            wants[want] = list(area_desc.includes)
+        if (name := KNOWN_AREAS_CASEFOLDED.get(want_folded := want.casefold())) is not None:
+            wants[want] = list(KNOWN_AREAS[name].includes)
             continue
-        for k, area_desc in known_folded.items():
-            if fnmatch(k, want.casefold()):
+        for k, name in KNOWN_AREAS_CASEFOLDED.items():
+            if fnmatch(k, want_folded):
+                area_desc = KNOWN_AREAS[name]
                 print(f"  + {area_desc.name}")
                 wants[area_desc.name] = list(area_desc.includes)
     print(f"Parsed {len(wants)} areas")
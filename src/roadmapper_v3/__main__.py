@@ -4,23 +4,25 @@
 from __future__ import annotations
 
 import argparse
-from itertools import cycle
+import multiprocessing as MP
 from pathlib import Path
-from typing import Protocol, cast
-
-from PIL import Image, ImageDraw
+from typing import TYPE_CHECKING, Protocol, cast
 
 from roadmapper_v3.draw import SegmentDrawer
 from roadmapper_v3.model import Point, SegmentMode, merge_all_routes
 from roadmapper_v3.model.yaml import load_from
 from sl_maptools.colors import AUTO_COLORS
 
+if TYPE_CHECKING:
+    from roadmapper_v3.model import Continent
+
 
 class Options(Protocol):
     """Represent options extracted from CLI"""
 
     savedir: Path
     conti: str
+    workers: int
     yaml_file: list[Path]
 
 
@@ -29,12 +31,80 @@ def _get_options() -> Options:
     parser = argparse.ArgumentParser("roadmapper_v3")
     parser.add_argument("--savedir", "-s", required=True, type=Path, help="Directory to save the road overlays in")
     parser.add_argument("--conti", "-c", default="", help="Comma-separated continents to render (defaults to all)")
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=1,
+        help=(
+            "Max number of continents to draw in parallel. Each holds a full canvas in memory (Bellisseria alone is "
+            "about 2 GB), so only raise this if there is memory to spare (default: %(default)s)"
+        ),
+    )
     parser.add_argument("yaml_file", nargs="+", type=Path, help="One (or more) YAML files to process & merge")
 
     _opts = parser.parse_args()
     return cast(Options, _opts)
 
 
+def draw_continent(continent: Continent, targ: Path, *, quiet: bool = False) -> Path:
+    """
+    Draw all routes of a continent onto a new transparent canvas, and save it as PNG.
+
+    :param continent: The Continent to draw
+    :param targ: Path of the PNG file to save to
+    :param quiet: If True, don't print the per-segment progress pips
+    """
+    # Imported here so argument errors & --help don't have to wait for Pillow to load
+    from PIL import Image, ImageDraw  # noqa: PLC0415
+
+    canvas = Image.new("RGBA", continent.canvas_dim)
+    draw = ImageDraw.Draw(canvas)
+
+    southwest = Point(continent.westmost, continent.southmost)
+    draw_ers = [
+        SegmentDrawer(route=route, segment=segment, drawer=draw, geo_southwest=southwest)
+        for route in continent.routes.values()
+        for segment in route.segments
+    ]
+    for drawer in draw_ers:
+        drawer.draw_outline()
+    prev_ro: str = ""
+    for drawer in draw_ers:
+        drawer.draw_actual()
+        if quiet:
+            continue
+        if drawer.route.name != prev_ro:
+            print(f"\n{continent.name}::{drawer.route.name}", end="", flush=True)
+            prev_ro = drawer.route.name
+        segment = drawer.segment
+        if segment.mode == SegmentMode.SOLID:
+            print(".", end="", flush=True)
+        elif segment.mode == SegmentMode.DASHED:
+            print("-", end="", flush=True)
+        elif segment.mode == SegmentMode.RAILS:
+            print("=", end="", flush=True)
+        elif segment.mode == SegmentMode.ARC:
+            print("(", end="", flush=True)
+        elif segment.mode == SegmentMode.ARROW:
+            print(">", end="", flush=True)
+    if not quiet:
+        print("\n==========")
+        print(f"Saving to {targ} ...", end="", flush=True)
+    canvas.save(targ)
+    if not quiet:
+        print()
+    return targ
+
+
+def draw_job(job: tuple[Continent, Path, dict[str, tuple[int, int, int] | None]]) -> Path:
+    """Unmarshal a job tuple into proper params for draw_continent, in a worker process"""
+    continent, targ, route_colors = job
+    # Colors were handed out by the parent, in the same order a serial run would, so every worker agrees on them
+    SegmentDrawer.set_route_colors(route_colors)
+    return draw_continent(continent, targ, quiet=True)
+
+
 def main(opts: Options) -> None:  # noqa: D103
     # savedir: Path, conti: str, yaml_file: list[Path]
     savedir = opts.savedir
@@ -59,46 +129,33 @@ def main(opts: Options) -> None:  # noqa: D103
         all_routes = merge_all_routes(all_routes, data)
         print()
 
-    SegmentDrawer.ColorCycler = cycle(AUTO_COLORS.values())
+    SegmentDrawer.Palette = tuple(AUTO_COLORS.values())
 
+    wanted: list[tuple[Continent, Path]] = []
     for conti_name, continent in all_routes.items():
         if conti_set and conti_name.casefold() not in conti_set:
             print(f"Skipping {conti_name}", flush=True)
             continue
-        canvas = Image.new("RGBA", continent.canvas_dim)
-        draw = ImageDraw.Draw(canvas)
-
-        southwest = Point(continent.westmost, continent.southmost)
-        draw_ers = [
-            SegmentDrawer(route=route, segment=segment, drawer=draw, geo_southwest=southwest)
-            for route in continent.routes.values()
-            for segment in route.segments
-        ]
-        for drawer in draw_ers:
-            drawer.draw_outline()
-        prev_ro: str = ""
-        for drawer in draw_ers:
-            if drawer.route.name != prev_ro:
-                print(f"\n{continent.name}::{drawer.route.name}", end="", flush=True)
-                prev_ro = drawer.route.name
-            drawer.draw_actual()
-            segment = drawer.segment
-            if segment.mode == SegmentMode.SOLID:
-                print(".", end="", flush=True)
-            elif segment.mode == SegmentMode.DASHED:
-                print("-", end="", flush=True)
-            elif segment.mode == SegmentMode.RAILS:
-                print("=", end="", flush=True)
-            elif segment.mode == SegmentMode.ARC:
-                print("(", end="", flush=True)
-            elif segment.mode == SegmentMode.ARROW:
-                print(">", end="", flush=True)
-        print("\n==========")
-
-        targ = savedir / f"{conti_name}_Roads3.png"
-        print(f"Saving to {targ} ...", end="", flush=True)
-        canvas.save(targ)
-        print()
+        wanted.append((continent, savedir / f"{conti_name}_Roads3.png"))
+
+    if len(wanted) < 2 or opts.workers < 2:  # noqa: PLR2004
+        for continent, targ in wanted:
+            draw_continent(continent, targ)
+        return
+
+    # Continents are drawn onto separate canvases, so they can be rendered side by side. Only the auto-assigned
+    # route colors depend on drawing order; assign them here first, the same way a serial run would.
+    for continent, _ in wanted:
+        for route in continent.routes.values():
+            if any(len(seg.geopoints) > 1 for seg in route.segments):
+                SegmentDrawer.color_for(route)
+    route_colors = SegmentDrawer.route_colors()
+    jobs = [(continent, targ, route_colors) for continent, targ in wanted]
+    workers = min(len(jobs), opts.workers)
+    print(f"Drawing {len(jobs)} continents with {workers} workers ...", flush=True)
+    with MP.Pool(workers) as pool:
+        for targ in pool.imap_unordered(draw_job, jobs):
+            print(f"Saved {targ}", flush=True)
 
 
 if __name__ == "__main__":
@@ -4,13 +4,14 @@
 from __future__ import annotations
 
 import math
-from itertools import cycle, pairwise
+from functools import cache
+from itertools import pairwise
 from typing import TYPE_CHECKING, NamedTuple
 
 from roadmapper_v3.model import Point, Route, Segment, SegmentMode
 
 if TYPE_CHECKING:
-    from collections.abc import Generator
+    from collections.abc import Generator, Iterable
 
     from PIL import ImageDraw
 
@@ -94,41 +95,42 @@ class LinePattern:
             self.phases[phase_name] = PhaseDesc(phase_len, clr)
 
 
-def drawline_patterned(
-    drawer: ImageDraw.ImageDraw,
+def _piece_points(segments: list[tuple[Point, Point]]) -> list[Point]:
+    """Join consecutive (start, end) pairs of a pattern piece into one polyline"""
+    drawpoints: list[Point] = []
+    prev_p2 = segments[0][0]
+    _p2 = None
+    for _p1, _p2 in segments:
+        assert _p1.is_close(prev_p2)
+        drawpoints.append(_p1)
+        prev_p2 = _p2
+    drawpoints.append(_p2)
+    return drawpoints
+
+
+def iter_pattern_pieces(
     pattern: LinePattern,
     points: list[Point],
-    width: int = 10,
     min_len: float = 0.01,
-    extend_by: float | None = None,
-) -> None:
+) -> Generator[tuple[str, list[Point]], None, None]:
+    """
+    Walk a polyline along a LinePattern, yielding (phase name, polyline) for every piece that needs to be drawn.
+
+    Pieces of phases without a color (gaps) are skipped. Only phase names are yielded, not colors, so the pieces can
+    be reused with any pattern having the same phases & lengths (e.g. the black outline of a colored dash pattern).
+    """
     segments: list[tuple[Point, Point]] = []
 
-    pattern_cycle = cycle(pattern.phases.items())
+    # Phases are stepped through by index, wrapping around, rather than via itertools.cycle() + next()
+    phases = tuple(pattern.phases.items())
+    phase_count = len(phases)
+    phase_idx = 0
     point_pairs = pairwise(points)
 
-    phase, (phase_len, phase_clr) = next(pattern_cycle)  # pylint: disable=unused-variable
+    phase, (phase_len, phase_clr) = phases[0]
     pline: ParametricLine | None = None
     p1 = p2 = Point(math.nan, math.nan)
 
-    def _do_draw():
-        if phase_clr is None:
-            segments.clear()
-            return
-        drawpoints: list[Point] = []
-        prev_p2 = segments[0][0]
-        _p2 = None
-        for _p1, _p2 in segments:
-            assert _p1.is_close(prev_p2)
-            drawpoints.append(_p1)
-            prev_p2 = _p2
-        drawpoints.append(_p2)
-        if extend_by:
-            drawpoints = extend_ends(drawpoints, extend_by)
-        drawpoints_int = [p.rounded() for p in drawpoints]
-        drawer.line(drawpoints_int, fill=phase_clr, width=width, joint="curve")
-        segments.clear()
-
     while True:
         if pline is None:
             try:
@@ -141,23 +143,52 @@ def drawline_patterned(
         if pline_len > phase_len:
             p3 = pline.move_start_by(phase_len)
             segments.append((p1, p3))
-            _do_draw()
+            if phase_clr is not None:
+                yield phase, _piece_points(segments)
+            segments.clear()
             p1 = p3
-            phase, (phase_len, phase_clr) = next(pattern_cycle)
+            phase_idx = (phase_idx + 1) % phase_count
+            phase, (phase_len, phase_clr) = phases[phase_idx]
             continue
 
         segments.append((p1, p2))
         phase_len -= pline_len
         pline = None
         if abs(phase_len) < min_len:
-            _do_draw()
-            phase, (phase_len, phase_clr) = next(pattern_cycle)
+            if phase_clr is not None:
+                yield phase, _piece_points(segments)
+            segments.clear()
+            phase_idx = (phase_idx + 1) % phase_count
+            phase, (phase_len, phase_clr) = phases[phase_idx]
 
-    if segments:
-        _do_draw()
+    if segments and phase_clr is not None:
+        yield phase, _piece_points(segments)
 
 
+def drawline_patterned(
+    drawer: ImageDraw.ImageDraw,
+    pattern: LinePattern,
+    points: list[Point],
+    width: int = 10,
+    min_len: float = 0.01,
+    extend_by: float | None = None,
+    pieces: Iterable[tuple[str, list[Point]]] | None = None,
+) -> None:
+    """Draw a line in a pattern; pass already-computed iter_pattern_pieces() output as pieces= to reuse it"""
+    # All the pattern geometry is worked out first; this loop only feeds the finished pieces to Pillow
+    if pieces is None:
+        pieces = iter_pattern_pieces(pattern, points, min_len)
+    phases = pattern.phases
+    line = drawer.line
+    for phase, drawpoints in pieces:
+        pts = extend_ends(drawpoints, extend_by) if extend_by else drawpoints
+        line([(round(x), round(y)) for x, y in pts], fill=phases[phase].color, width=width, joint="curve")
+
+
+# Patterns are never modified after construction, so the factories below build each (color, lengths) combination
+# only once; every segment drawn with it then shares the same LinePattern.
 # def dash_pattern(color: tuple[int, int, int], dash_len: int = 60, blank_len: int = 40):
+@cache
 def dash_pattern(color: tuple[int, int, int], dash_len: int = 50, blank_len: int = 30) -> LinePattern:
     return LinePattern(
         color,
@@ -166,6 +197,7 @@ def dash_pattern(color: tuple[int, int, int], dash_len: int = 50, blank_len: int
     )
 
 
+@cache
 def rails_pattern(color: tuple[int, int, int], dash_len: int = 60, pip_len: int = 15, gap_len: int = 10) -> LinePattern:
     return LinePattern(
         color,
@@ -176,6 +208,7 @@ def rails_pattern(color: tuple[int, int, int], dash_len: int = 60, pip_len: int
     )
 
 
+@cache
 def dotgap_pattern(color: tuple[int, int, int], gap_len: int = 40) -> LinePattern:
     return LinePattern(
         color,
@@ -193,7 +226,8 @@ def drawline_solid(
 ) -> None:
     if extend_by:
         points = extend_ends(points, extend_by)
-    int_points = [p.rounded() for p in points]
+    # Same as Point.rounded(), inlined to skip a method call per point
+    int_points = [(round(x), round(y)) for x, y in points]
     drawer.line(int_points, width=width, fill=color, joint="curve")
 
 
@@ -291,6 +325,7 @@ def drawarrow(
     pattern: LinePattern,
     both: bool = True,
     extend_by: float | None = None,
+    pieces: Iterable[tuple[str, list[Point]]] | None = None,
 ) -> None:
     """
     Draw an arrow with patterned line.
@@ -301,8 +336,9 @@ def drawarrow(
     :param pattern: Pattern of the line
     :param both: If True (default) draw arrow on both ends. If False, draw only at end
     :param extend_by: Extend the endings by this many pixels
+    :param pieces: Pieces of the patterned line, if already calculated by iter_pattern_pieces()
     """
-    drawline_patterned(drawer, pattern, points, width, extend_by=extend_by)
+    drawline_patterned(drawer, pattern, points, width, extend_by=extend_by, pieces=pieces)
 
     if both:
         p1 = points[1]
@@ -317,10 +353,12 @@ def drawarrow(
 
 
 class SegmentDrawer:
-    __slots__ = ("route", "segment", "mode", "drawer", "geo_southwest")
+    __slots__ = ("route", "segment", "mode", "drawer", "geo_southwest", "_canv_points", "_pieces")
     OutlineWidth = 35
     ActualWidth = 25
-    ColorCycler: Generator[tuple[int, int, int], None, None] = None
+    Palette: tuple[tuple[int, int, int], ...] = ()
+    """Colors handed out, in turn, to routes that don't have an explicit color"""
+    _palette_idx: int = 0
 
     _RouteColors: dict[str, tuple[int, int, int]] = {}
 
@@ -330,57 +368,92 @@ class SegmentDrawer:
         self.mode = segment.mode
         self.drawer = drawer
         self.geo_southwest = geo_southwest
+        self._canv_points: list[Point] | None = None
+        self._pieces: list[tuple[str, list[Point]]] | None = None
+
+    @classmethod
+    def color_for(cls, route: Route) -> tuple[int, int, int] | None:
+        """Color to draw a route with; routes without an explicit color get the next Palette color on first ask"""
+        _route_colors = cls._RouteColors  # pylint: disable=protected-access
+        if route.name not in _route_colors:
+            color = route.color
+            if color is None and (palette := cls.Palette):
+                color = palette[cls._palette_idx]
+                cls._palette_idx = (cls._palette_idx + 1) % len(palette)
+            _route_colors[route.name] = color
+        return _route_colors[route.name]
+
+    @classmethod
+    def route_colors(cls) -> dict[str, tuple[int, int, int] | None]:
+        """The colors handed out so far, by route name"""
+        return cls._RouteColors
+
+    @classmethod
+    def set_route_colors(cls, route_colors: dict[str, tuple[int, int, int] | None]) -> None:
+        """Replace the colors handed out so far, e.g., with those assigned by another process"""
+        cls._RouteColors = route_colors
 
     def _route_color(self) -> tuple[int, int, int] | None:
-        _route_colors = self.__class__._RouteColors  # pylint: disable=protected-access
-        if self.route.name not in _route_colors:
-            color = self.route.color
-            if color is None:
-                if self.__class__.ColorCycler is not None:
-                    color = next(self.__class__.ColorCycler)
-            _route_colors[self.route.name] = color
-        return _route_colors[self.route.name]
+        return self.color_for(self.route)
+
+    @property
+    def canv_points(self) -> list[Point]:
+        """Segment's points in canvas coordinates; calculated once and shared by the outline & actual passes"""
+        if self._canv_points is None:
+            # noinspection PyUnresolvedReferences
+            _, cheight = self.drawer.im.size
+            sw_x, sw_y = self.geo_southwest
+            self._canv_points = [Point(p.x - sw_x, cheight - (p.y - sw_y)) for p in self.segment.geopoints]
+        return self._canv_points
+
+    def _shared_pieces(self, pattern: LinePattern) -> list[tuple[str, list[Point]]]:
+        """
+        Pattern pieces of this segment, walked only once. Only for modes whose outline & actual passes use patterns
+        of the same shape (DASHED and the ARROWs), differing just in color.
+        """
+        if self._pieces is None:
+            self._pieces = list(iter_pattern_pieces(pattern, self.canv_points))
+        return self._pieces
 
     def draw_outline(self, extend_by: float = 4.0, extend_by_deg: float = 2.0) -> None:
-        if not self.segment.geopoints:
+        # A lone point has no direction to extend or pattern along, so there is nothing to draw
+        if len(self.segment.geopoints) < 2:  # noqa: PLR2004
             return
         draw = self.drawer
-        # noinspection PyUnresolvedReferences
-        _, cheight = draw.im.size
         if self.segment.width is None:  # noqa: SIM108
             width = self.__class__.OutlineWidth
         else:
             width = round(self.segment.width * 1.4)
-        sw_x, sw_y = self.geo_southwest
-        canv_points = [Point(p.x - sw_x, cheight - (p.y - sw_y)) for p in self.segment.geopoints]
+        canv_points = self.canv_points
         if self.mode in (SegmentMode.SOLID, SegmentMode.RAILS):
             drawline_solid(draw, canv_points, width, (0, 0, 0), extend_by=extend_by)
         elif self.mode == SegmentMode.DASHED:
             pattern = dash_pattern((0, 0, 0))
-            drawline_patterned(draw, pattern, canv_points, width, extend_by=extend_by)
+            pieces = self._shared_pieces(pattern)
+            drawline_patterned(draw, pattern, canv_points, width, extend_by=extend_by, pieces=pieces)
         elif self.mode == SegmentMode.ARC:
             drawarc(draw, canv_points, width, (0, 0, 0), extend_by_deg=extend_by_deg)
         elif self.mode in (SegmentMode.ARROW, SegmentMode.ARROW2):
             pattern = dotgap_pattern((0, 0, 0))
-            drawarrow(draw, canv_points, width, pattern, extend_by=extend_by)
+            drawarrow(draw, canv_points, width, pattern, extend_by=extend_by, pieces=self._shared_pieces(pattern))
         elif self.mode == SegmentMode.ARROW1:
             pattern = dotgap_pattern((0, 0, 0))
-            drawarrow(draw, canv_points, width, pattern, both=False, extend_by=extend_by)
+            drawarrow(
+                draw, canv_points, width, pattern, both=False, extend_by=extend_by, pieces=self._shared_pieces(pattern)
+            )
         else:
             raise NotImplementedError(f"Don't know how to draw mode: {self.mode!r}")
 
     def draw_actual(self) -> None:
-        if not self.segment.geopoints:
+        # A lone point has no direction to extend or pattern along, so there is nothing to draw
+        if len(self.segment.geopoints) < 2:  # noqa: PLR2004
             return
         draw = self.drawer
-        # noinspection PyUnresolvedReferences
-        _, cheight = draw.im.size
         if self.segment.width is None:  # noqa: SIM108
             width = self.__class__.ActualWidth
         else:
             width = self.segment.width
-        sw_x, sw_y = self.geo_southwest
-        canv_points = [Point(p.x - sw_x, cheight - (p.y - sw_y)) for p in self.segment.geopoints]
+        canv_points = self.canv_points
         color = self._route_color()
         if self.mode == SegmentMode.SOLID:
             drawline_solid(draw, canv_points, width, color)
@@ -389,14 +462,14 @@ class SegmentDrawer:
             drawline_patterned(draw, pattern, canv_points, width)
         elif self.mode == SegmentMode.DASHED:
             pattern = dash_pattern(color)
-            drawline_patterned(draw, pattern, canv_points, width)
+            drawline_patterned(draw, pattern, canv_points, width, pieces=self._shared_pieces(pattern))
         elif self.mode == SegmentMode.ARC:
             drawarc(draw, canv_points, width, color)
         elif self.mode in (SegmentMode.ARROW, SegmentMode.ARROW2):
             pattern = dotgap_pattern(color)
-            drawarrow(draw, canv_points, width, pattern)
+            drawarrow(draw, canv_points, width, pattern, pieces=self._shared_pieces(pattern))
         elif self.mode == SegmentMode.ARROW1:
             pattern = dotgap_pattern(color)
-            drawarrow(draw, canv_points, width, pattern, both=False)
+            drawarrow(draw, canv_points, width, pattern, both=False, pieces=self._shared_pieces(pattern))
         else:
             raise NotImplementedError(f"Don't know how to draw mode: {self.mode!r}")
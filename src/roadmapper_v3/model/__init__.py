@@ -5,10 +5,13 @@ from __future__ import annotations
 
 import math
 from enum import IntEnum
-from typing import NamedTuple
+from typing import TYPE_CHECKING, NamedTuple
 
 from sl_maptools.knowns import KNOWN_AREAS
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
 
 class Point(NamedTuple):
     x: float
@@ -25,6 +28,20 @@ class Point(NamedTuple):
 
 
 class Continent:
+    __slots__ = (
+        "name",
+        "bounds",
+        "west_t",
+        "south_t",
+        "east_t",
+        "north_t",
+        "westmost",
+        "eastmost",
+        "southmost",
+        "northmost",
+        "routes",
+    )
+
     def __init__(self, name: str):
         if name not in KNOWN_AREAS:
             raise KeyError()
@@ -96,7 +113,7 @@ class Route:
     def __contains__(self, item: Segment):
         if not isinstance(item, Segment):
             raise ValueError()
-        return item.as_inttuple() in self.segments_as_set
+        return item.merge_key() in self.segments_as_set
 
     def add_segment(self, seg: Segment, raises: bool = True) -> None:
         """
@@ -106,18 +123,18 @@ class Route:
         :param raises: If True (default), raises an exception if the segment is already added. If False, will discard
         the addition silently.
         """
-        seg_inttuple = seg.as_inttuple()
-        if seg_inttuple in self.segments_as_set:
+        seg_key = seg.merge_key()
+        if seg_key in self.segments_as_set:
             if raises:
                 raise ValueError("Double Segments Detected!")
             return
         self.segments.append(seg)
-        self.segments_as_set.add(seg_inttuple)
+        self.segments_as_set.add(seg_key)
 
     def discard_last_segment(self) -> None:
         last_seg = self.segments.pop()
-        last_seg_inttuple = last_seg.as_inttuple()
-        self.segments_as_set.remove(last_seg_inttuple)
+        last_seg_key = last_seg.merge_key()
+        self.segments_as_set.remove(last_seg_key)
 
 
 class SegmentMode(IntEnum):
@@ -131,24 +148,50 @@ class SegmentMode(IntEnum):
 
 
 class Segment:
-    __slots__ = ("mode", "geopoints", "geopoints_intset", "desc", "width")
+    __slots__ = ("mode", "geopoints", "_last_key", "desc", "width")
 
     def __init__(self, mode: SegmentMode = SegmentMode.SOLID, desc: str = None, width: int = None):
         self.mode: SegmentMode = mode
         self.geopoints: list[Point] = []
-        self.geopoints_intset: set[tuple[int, int]] = set()
+        self._last_key: tuple[int, int] | None = None  # Rounded form of the last point added
         self.desc = desc
         self.width: int | None = width
 
     def as_inttuple(self) -> tuple[tuple[int, int], ...]:
         return tuple(p.rounded() for p in self.geopoints)
 
+    def merge_key(self) -> tuple[tuple[int, int], ...]:
+        """
+        Rounded points of the segment, leaving out any revisit of an earlier point.
+
+        Segments used to drop every revisited point when built, so that's how they are stored in older roads YAML files.
+        Route compares segments by this key so those still match the same segment parsed again.
+        """
+        return tuple(dict.fromkeys(p.rounded() for p in self.geopoints))
+
     def add_point(self, p: Point) -> None:
-        if p.rounded() in self.geopoints_intset:
+        # Only a repeat of the immediately preceding point is dropped; a road that loops back or crosses itself
+        # legitimately revisits earlier coordinates
+        if (key := p.rounded()) == self._last_key:
             return
         x, y = p
         self.geopoints.append(Point(round(x, 3), round(y, 3)))
-        self.geopoints_intset.add(p.rounded())
+        self._last_key = key
+
+    def add_points(self, points: Iterable[tuple[float, float]]) -> None:
+        """
+        Add many points at once, with the same de-duplication as add_point().
+
+        :param points: Iterable of Point objects or plain (x, y) pairs
+        """
+        last_key = self._last_key
+        append = self.geopoints.append
+        for x, y in points:
+            if (key := (round(x), round(y))) == last_key:
+                continue
+            append(Point(round(x, 3), round(y, 3)))
+            last_key = key
+        self._last_key = last_key
 
 
 def merge_all_routes(data1: dict[str, Continent], data2: dict[str, Continent]) -> dict[str, Continent]:
@@ -159,18 +202,14 @@ def merge_all_routes(data1: dict[str, Continent], data2: dict[str, Continent]) -
             continent.add_route(route := Route(route_name))
             route.color = route_data.color
             for seg in route_data.segments:
-                new_seg = Segment(mode=seg.mode, desc=seg.desc)
-                for p in seg.geopoints:
-                    new_seg.add_point(p)
                 route.add_segment(seg)
     for conti_name, conti_data in data2.items():
-        continent = merged.setdefault(conti_name, Continent(conti_name))
+        if (continent := merged.get(conti_name)) is None:
+            continent = merged[conti_name] = Continent(conti_name)
         for route_name, route_data in conti_data.routes.items():
-            route = continent.routes.setdefault(route_name, Route(route_name))
+            if (route := continent.routes.get(route_name)) is None:
+                route = continent.routes[route_name] = Route(route_name)
             route.color = route_data.color
             for seg in route_data.segments:
-                new_seg = Segment(mode=seg.mode, desc=seg.desc)
-                for p in seg.geopoints:
-                    new_seg.add_point(p)
                 route.add_segment(seg, raises=False)
     return merged
@@ -3,20 +3,25 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Final
 
 import ruamel.yaml as ryaml
 
-from roadmapper_v3.model import Continent, Point, Route, Segment, SegmentMode
+from roadmapper_v3.model import Continent, Route, Segment, SegmentMode
 
 if TYPE_CHECKING:
     from pathlib import Path
 
+# Saved files hold the canonical upper-case names, so those resolve with one dict hit; anything else (hand-edited
+# files) falls back to the case-insensitive enum lookup
+_SEGMENT_MODES: Final[dict[str, SegmentMode]] = dict(SegmentMode.__members__)
+
 
 def decode(raw_data: dict[str, dict[str, dict[str, Any]]]) -> dict[str, Continent]:
     road_data: dict[str, dict[str, dict[str, Any]]] = raw_data["road_data"]
     assert isinstance(road_data, dict)
     all_routes = {}
+    segment_modes = _SEGMENT_MODES
     for cont_name, routes in road_data.items():
         continent = Continent(cont_name)
         all_routes[cont_name] = continent
@@ -25,10 +30,11 @@ def decode(raw_data: dict[str, dict[str, dict[str, Any]]]) -> dict[str, Continen
             route = Route(rout_name, color)
             segments: list[dict[str, Any]] = route_data["segments"]
             for seg_data in segments:
-                mode = SegmentMode[seg_data["mode"].upper()]
+                mode_name = seg_data["mode"]
+                if (mode := segment_modes.get(mode_name)) is None:
+                    mode = SegmentMode[mode_name.upper()]
                 segment = Segment(mode, desc=seg_data.get("desc"), width=seg_data.get("width"))
-                for x, y in seg_data["geo_points"]:
-                    segment.add_point(Point(x, y))
+                segment.add_points(seg_data["geo_points"])
                 route.add_segment(segment)
             continent.add_route(route)
     return all_routes
@@ -38,7 +44,9 @@ def load_from(yaml_file: Path) -> dict[str, Continent]:
     # pylint: disable=duplicate-code
     if not yaml_file.exists():
         raise FileNotFoundError()
-    yaml = ryaml.YAML(typ="safe", pure=True)
+    # Not pure=True: loading is read-only, so let ruamel use its C parser (ruamel.yaml.clib) when installed. It
+    # falls back to the pure-Python one by itself if not.
+    yaml = ryaml.YAML(typ="safe")
     with yaml_file.open("rt", encoding="utf-8") as fin:
         data: dict = yaml.load(fin)
     assert isinstance(data, dict)
@@ -61,11 +69,13 @@ def encode(all_routes: dict[str, Continent]) -> dict[str, dict[str, dict[str, An
             }
             cont_data[rout_name] = rout_data
             for segment in route.segments:
+                # Points are tuples already, and RoadRepresenter emits every tuple as a flow sequence; no need to
+                # rebuild each one
                 seg_data = {
                     "mode": segment.mode.name,
                     "desc": segment.desc,
                     "width": segment.width,
-                    "geo_points": [(p.x, p.y) for p in segment.geopoints],
+                    "geo_points": list(segment.geopoints),
                 }
                 rout_seg_list.append(seg_data)
     return {
@@ -5,25 +5,71 @@ from __future__ import annotations
 
 import argparse
 import datetime
+import functools
 import math
+import multiprocessing as MP
 import re
+import sys
 from pathlib import Path
-from typing import Final, Protocol, cast
+from typing import TYPE_CHECKING, ClassVar, Final, Protocol, cast
 
 from roadmapper_v3.model import Continent, Point, Route, Segment, SegmentMode
 from roadmapper_v3.model.yaml import load_from, save_to
 from sl_maptools.colors import ALL_COLORS
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator, Iterable, Iterator
+
 RE_TS: Final = re.compile(
     r"(?P<year>\d{4})[/-]?(?P<month>\d{1,2})[/-]?(?P<day>\d{1,2})"
     r"\D+"
     r"(?P<hour>\d{1,2})\D?(?P<minute>\d{2})(?:\D?(?P<second>\d{2}))?"
 )
 RE_VECTOR: Final = re.compile(r"\s*<\s*(-?[\d.]+),\s*(-?[\d.]+),\s*(-?[\d.]+)\s*>\s*")
-RE_POSREC_LINE: Final = re.compile(r"(?P<prefix>.*?)PosRecorder\s*(?P<ver>[^:]*):(?:\s+:)?\s+(?P<entry>.*)")
-RE_POSREC_KV: Final = re.compile(r"(?P<key>[^:\s]+)\s*:\s*(?P<value>.*)")
+# The chat line's own timestamp is captured by the same match (the optional non-capturing group), so each line is
+# scanned only once
+RE_POSREC_LINE: Final = re.compile(
+    r"(?:.*?" + RE_TS.pattern + r")?"
+    r".*?PosRecorder\s*(?P<ver>[^:]*):(?:\s+:)?\s+"
+    r"(?:(?P<comment>#.*)|(?P<posrec>3;;.*)|(?P<command>(?P<cmd_name>[^:]*)(?::(?P<cmd_args>.*))?))"
+)
 RE_SEPARATOR: Final = re.compile(r"[;,\s]+")
 
+# Bound once so per-record / per-line callers skip the attribute lookup
+_match_vector: Final = RE_VECTOR.match
+
+
+def parse_vector(vec: str) -> tuple[float, float, float] | None:
+    """Parse an LSL vector '<x, y, z>' into 3 floats, or None if it isn't one"""
+    # PosRecorder always emits well-formed vectors, so try a plain split first and only use the regex as fallback
+    vec = vec.strip()
+    if vec[:1] == "<" and vec[-1:] == ">":
+        try:
+            x, y, z = vec[1:-1].split(",")
+            return float(x), float(y), float(z)
+        except ValueError:
+            pass
+    if (matches := _match_vector(vec)) is None:
+        return None
+    x, y, z = matches.groups()
+    return float(x), float(y), float(z)
+
+
+# A region's corner is identical for every record taken inside that region, so parse each distinct string once
+_parse_corner: Final = functools.lru_cache(maxsize=1024)(parse_vector)
+
+_TS_GROUPS: Final = ("year", "month", "day", "hour", "minute", "second")
+
+
+@functools.lru_cache(maxsize=1024)
+def _to_datetime(year: str, month: str, day: str, hour: str, minute: str, second: str | None) -> datetime.datetime:
+    """Build a datetime from RE_TS groups; cached since runs of consecutive chat lines share the same timestamp"""
+    return datetime.datetime(int(year), int(month), int(day), int(hour), int(minute), int(second or 0))
+
+
+KIND_COMMAND: Final[int] = 0
+KIND_POSREC: Final[int] = 1
+
 
 class Options(Protocol):
     startfrom: str
@@ -61,6 +107,7 @@ def options() -> Options:
 
 class ChatLine:
     __slots__ = ("source_path", "source_line")
+    KIND: ClassVar[int] = -1
 
     def __init__(self, spath, sline):
         self.source_path: Path = spath
@@ -73,6 +120,7 @@ class ChatLine:
 
 class PosRecord(ChatLine):
     __slots__ = ("region_name", "parcel_name", "region_corner", "pos_local")
+    KIND: ClassVar[int] = KIND_POSREC
 
     # noinspection PyUnusedLocal
     def __init__(self, line: str, spath: Path, sline: int):
@@ -81,14 +129,15 @@ class PosRecord(ChatLine):
         elems = line.split(";;")
         assert len(elems) >= 5
         _, regname, parname, regcorner, pos, *_etc = elems
-        self.region_name = regname
-        self.parcel_name = parname
-        if (matches := RE_VECTOR.match(regcorner)) is None:
+        # The same few names repeat across thousands of records; keep just one copy of each
+        self.region_name = sys.intern(regname)
+        self.parcel_name = sys.intern(parname)
+        if (region_corner := _parse_corner(regcorner)) is None:
             raise ValueError(f"Can't parse region corner: {regcorner}")
-        self.region_corner = tuple(map(float, matches.groups()))
-        if (matches := RE_VECTOR.match(pos)) is None:
+        self.region_corner = region_corner
+        if (pos_local := parse_vector(pos)) is None:
             raise ValueError(f"Can't parse position: {pos}")
-        self.pos_local = tuple(map(float, matches.groups()))
+        self.pos_local = pos_local
 
     def to_point(self) -> Point:
         xr, yr, _ = self.region_corner
@@ -97,158 +146,234 @@ class PosRecord(ChatLine):
 
 
 class ChatCommand(ChatLine):
-    def __init__(self, line: str, *, spath: Path, sline: int):
-        super().__init__(spath, sline)
-        elems = list(map(str.strip, line.split(":", maxsplit=1)))
-        command, *args = elems
-        self.command = command.casefold()
-        self.args = args[0] if args else ""
+    __slots__ = ("command", "args")
+    KIND: ClassVar[int] = KIND_COMMAND
 
-    def as_tuple(self) -> tuple[str, str]:
-        return self.command, self.args
+    def __init__(self, command: str, args: str | None, *, spath: Path, sline: int):
+        super().__init__(spath, sline)
+        # Interned, so the handful of distinct command names are stored once however many records repeat them
+        self.command = sys.intern(command.strip().casefold())
+        self.args = args.strip() if args else ""
 
 
-def parse(chat_file: Path, startfrom: str) -> list[PosRecord | ChatCommand]:
+def parse(chat_file: Path, startfrom: str) -> Generator[PosRecord | ChatCommand, None, None]:
+    """Lazily parse a chat transcript, so bake() can consume records as they are produced"""
     if not chat_file.exists():
         raise FileNotFoundError(f"File not found: {chat_file}")
 
     if startfrom:
         if (matches := RE_TS.match(startfrom)) is None:
             raise ValueError(f"Unrecognized timestamp format: {startfrom}")
-        start_ts = datetime.datetime(**matches.groupdict())
+        start_ts = _to_datetime(*matches.group(*_TS_GROUPS))
     else:
-        start_ts = datetime.datetime(2000, 1, 1, 0, 0, 0)
+        # No filtering at all, so lines' timestamps need not be converted
+        start_ts = None
+
+    # Chat transcripts can be tens of MB of mostly ordinary chatter. Read the raw bytes in one go and jump from one
+    # "PosRecorder" occurrence to the next with C-level find(), so uninteresting lines are never split out, decoded,
+    # or even allocated. Line numbers are counted on b"\n" only (not splitlines()) so they match what an editor
+    # shows; a leftover "\r" from CRLF files is removed by the strip() below.
+    data = chat_file.read_bytes()
+    find = data.find
+    match_posrec = RE_POSREC_LINE.match
+    to_datetime = _to_datetime
+    lnum = 1
+    counted_to = 0
+    pos = find(b"PosRecorder")
+    while pos >= 0:
+        ln_start = data.rfind(b"\n", 0, pos) + 1
+        if (ln_end := find(b"\n", pos)) < 0:
+            ln_end = len(data)
+        lnum += data.count(b"\n", counted_to, ln_start)
+        counted_to = ln_start
+        pos = find(b"PosRecorder", ln_end)
+        ln = data[ln_start:ln_end].decode("utf-8").strip()
+        # One match both extracts the entry and classifies it; lastgroup tells us which alternative matched
+        if (matches := match_posrec(ln)) is None:
+            continue
+        kind = matches.lastgroup
+        if kind == "comment":
+            continue
+        # A line without a timestamp can't be placed in time, so it's never filtered out
+        if start_ts is not None and matches["year"] and to_datetime(*matches.group(*_TS_GROUPS)) < start_ts:
+            continue
+        if kind == "posrec":
+            yield PosRecord(matches["posrec"], spath=chat_file, sline=lnum)
+            continue
+        yield ChatCommand(matches["cmd_name"], matches["cmd_args"], spath=chat_file, sline=lnum)
 
-    parsed: list[PosRecord | ChatCommand] = []
-    with chat_file.open("rt", encoding="utf-8") as fin:
-        for lnum, ln in enumerate(fin, start=1):
-            ln = ln.strip()
-            if (matches := RE_POSREC_LINE.match(ln)) is None:
-                continue
-            entry = matches["entry"]
-            if entry.startswith("#"):
-                continue
-            match_ts = RE_TS.search(matches["prefix"])
-            ln_ts = datetime.datetime(**{k: int(v) for k, v in match_ts.groupdict().items() if v})
-            if ln_ts < start_ts:
-                continue
-            if entry.startswith("3;;"):
-                pos_record = PosRecord(entry, spath=chat_file, sline=lnum)
-                parsed.append(pos_record)
-                continue
-            command = ChatCommand(entry, spath=chat_file, sline=lnum)
-            parsed.append(command)
 
-    return parsed
+def parse_job(job: tuple[Path, str]) -> list[PosRecord | ChatCommand]:
+    """Unmarshal a job tuple into params for parse(), collecting the records so they can be sent back whole"""
+    chat_file, startfrom = job
+    return list(parse(chat_file, startfrom))
 
 
 IGNORED_COMMANDS = {"pos", "endroute", "start", "stop"}
 
 
-def bake(parsed: list[ChatLine]) -> dict[str, Continent]:
-    all_roads: dict[str, Continent] = {}
-    continent: Continent | None = None
-    route: Route | None = None
-    segment = Segment()
+class _BakeState:
+    """Mutable state of bake(), shared by the command handlers"""
 
-    def new_segment(mode: SegmentMode = SegmentMode.SOLID):
-        nonlocal segment
-        if len(segment.geopoints) > 1:
-            route.add_segment(segment)
-        segment = Segment(mode=mode)
+    __slots__ = ("all_roads", "continent", "route", "segment", "records")
 
-    prev_point = Point(math.nan, math.nan)
-    parsed_iter = iter(parsed)
-    while True:
+    def __init__(self, records: Iterator[ChatLine]):
+        self.all_roads: dict[str, Continent] = {}
+        self.continent: Continent | None = None
+        self.route: Route | None = None
+        self.segment: Segment | None = Segment()
+        self.records = records
+
+    def new_segment(self, mode: SegmentMode = SegmentMode.SOLID) -> None:
+        if len(self.segment.geopoints) > 1:
+            self.route.add_segment(self.segment)
+        self.segment = Segment(mode=mode)
+
+
+def _h_continent(state: _BakeState, cmd: ChatCommand) -> None:
+    name = sys.intern(cmd.args)
+    # Not setdefault(): that would build (and throw away) a Continent every time one is re-selected
+    if (continent := state.all_roads.get(name)) is None:
+        continent = state.all_roads[name] = Continent(name)
+    state.continent = continent
+
+
+def _h_route(state: _BakeState, cmd: ChatCommand) -> None:
+    name = sys.intern(cmd.args)
+    if state.route and len(state.segment.geopoints) >= 2:
+        state.route.add_segment(state.segment)
+    continent = state.continent
+    if name in continent:
+        state.route = continent[name]
+    else:
+        state.route = Route(name)
+        if "*DISCARD*" not in name:
+            continent.add_route(state.route)
+    state.segment = Segment()
+
+
+def _h_color(state: _BakeState, cmd: ChatCommand) -> None:
+    region_color = cmd.args
+    elems = RE_SEPARATOR.split(region_color)
+    if len(elems) == 3:
         try:
-            p = next(parsed_iter)
-        except StopIteration:
-            break
-
-        if isinstance(p, ChatCommand):
-            match p.as_tuple():
-                case "continent", name:
-                    continent = all_roads.setdefault(name, Continent(name))
-                case "route", name:
-                    if route and len(segment.geopoints) >= 2:
-                        route.add_segment(segment)
-                    if name in continent:
-                        route = continent[name]
-                    else:
-                        route = Route(name)
-                        if "*DISCARD*" not in route.name:
-                            continent.add_route(route)
-                    segment = Segment()
-                case "color", region_color:
-                    elems = RE_SEPARATOR.split(region_color)
-                    if len(elems) == 3:
-                        try:
-                            rgb = tuple(int(c) for c in elems)
-                        except ValueError:
-                            print(f"WARNING: Invalid number: {elems} ({p.source})")
-                            continue
-                        if not all(map(lambda x: 0 <= x <= 255, rgb)):
-                            print(
-                                f"WARNING: One of the RGB values is outside allowable range of 0~255: "
-                                f"{rgb} ({p.source})"
-                            )
-                        else:
-                            route.color = rgb
-                    else:
-                        if region_color not in ALL_COLORS:
-                            print(f"WARNING: Color name '{region_color}' not recognised ({p.source})")
-                        route.color = ALL_COLORS.get(region_color)
-                case "segdesc", segment_desc:
-                    segment.desc = segment_desc
-                case "mode", new_mode:
-                    try:
-                        new_mode = SegmentMode[new_mode]
-                    except KeyError as e:
-                        raise KeyError(f"Unrecognized mode '{new_mode}' ({p.source})") from e
-                    if new_mode != segment.mode:
-                        new_segment(new_mode)
-                case "break", _:
-                    new_segment()
-                case "solid", _:
-                    if segment.mode != SegmentMode.SOLID:
-                        new_segment(mode=SegmentMode.SOLID)
-                case "dashed", _:
-                    if segment.mode != SegmentMode.DASHED:
-                        new_segment(mode=SegmentMode.DASHED)
-                case "arc", _:
-                    new_segment(mode=SegmentMode.ARC)
-                    for _ in range(3):
-                        while not isinstance((rec := next(parsed_iter)), PosRecord):
-                            pass
-                        segment.add_point(cast(PosRecord, rec).to_point())
-                    new_segment()
-                case "endroute", _:
-                    if segment.geopoints:
-                        route.add_segment(segment)
-                    route = None
-                    segment = None
-                case other, _:
-                    if other not in IGNORED_COMMANDS:
-                        print(f"WARNING: Unrecognized command '{other}' ({p.source})")
-
-        elif isinstance(p, PosRecord):
-            if not continent.contains_geo(geop := p.to_point()):
+            rgb = tuple(int(c) for c in elems)
+        except ValueError:
+            print(f"WARNING: Invalid number: {elems} ({cmd.source})")
+            return
+        if not all(map(lambda x: 0 <= x <= 255, rgb)):
+            print(f"WARNING: One of the RGB values is outside allowable range of 0~255: {rgb} ({cmd.source})")
+        else:
+            state.route.color = rgb
+    else:
+        if (rgb := ALL_COLORS.get(region_color)) is None:
+            print(f"WARNING: Color name '{region_color}' not recognised ({cmd.source})")
+        state.route.color = rgb
+
+
+def _h_segdesc(state: _BakeState, cmd: ChatCommand) -> None:
+    state.segment.desc = cmd.args
+
+
+def _h_mode(state: _BakeState, cmd: ChatCommand) -> None:
+    try:
+        new_mode = SegmentMode[cmd.args]
+    except KeyError as e:
+        raise KeyError(f"Unrecognized mode '{cmd.args}' ({cmd.source})") from e
+    if new_mode != state.segment.mode:
+        state.new_segment(new_mode)
+
+
+def _h_break(state: _BakeState, _cmd: ChatCommand) -> None:
+    state.new_segment()
+
+
+def _h_solid(state: _BakeState, _cmd: ChatCommand) -> None:
+    if state.segment.mode != SegmentMode.SOLID:
+        state.new_segment(mode=SegmentMode.SOLID)
+
+
+def _h_dashed(state: _BakeState, _cmd: ChatCommand) -> None:
+    if state.segment.mode != SegmentMode.DASHED:
+        state.new_segment(mode=SegmentMode.DASHED)
+
+
+def _h_arc(state: _BakeState, _cmd: ChatCommand) -> None:
+    state.new_segment(mode=SegmentMode.ARC)
+    records = state.records
+    for _ in range(3):
+        while (rec := next(records)).KIND != KIND_POSREC:
+            pass
+        state.segment.add_point(cast(PosRecord, rec).to_point())
+    state.new_segment()
+
+
+def _h_unknown(_state: _BakeState, cmd: ChatCommand) -> None:
+    if cmd.command not in IGNORED_COMMANDS:
+        print(f"WARNING: Unrecognized command '{cmd.command}' ({cmd.source})")
+
+
+def _h_endroute(state: _BakeState, _cmd: ChatCommand) -> None:
+    if state.segment.geopoints:
+        state.route.add_segment(state.segment)
+    state.route = None
+    state.segment = None
+
+
+_HANDLERS: Final[dict[str, Callable[[_BakeState, ChatCommand], None]]] = {
+    "continent": _h_continent,
+    "route": _h_route,
+    "color": _h_color,
+    "segdesc": _h_segdesc,
+    "mode": _h_mode,
+    "break": _h_break,
+    "solid": _h_solid,
+    "dashed": _h_dashed,
+    "arc": _h_arc,
+    "endroute": _h_endroute,
+}
+
+
+def bake(parsed: Iterable[ChatLine]) -> dict[str, Continent]:
+    state = _BakeState(iter(parsed))
+    # Module-level lookups bound once, so the per-record path only touches locals
+    get_handler = _HANDLERS.get
+    h_unknown = _h_unknown
+
+    prev_point = Point(math.nan, math.nan)
+    # Bounds of the active continent, refreshed only when a "continent:" command switches to another one
+    bounds_of: Continent | None = None
+    west = south = east = north = math.nan
+    for p in state.records:
+        # Dispatch on the class-level tag rather than isinstance(), which has to walk the MRO for every record
+        kind = p.KIND
+        if kind == KIND_COMMAND:
+            get_handler(p.command, h_unknown)(state, p)
+
+        elif kind == KIND_POSREC:
+            if (continent := state.continent) is not bounds_of:
+                bounds_of = continent
+                west, south = continent.westmost, continent.southmost
+                east, north = continent.eastmost, continent.northmost
+            x, y = geop = p.to_point()
+            # Same test as Continent.contains_geo(), minus the method call & attribute lookups per point
+            if not (west <= x <= east and south <= y <= north):
                 print(f"WARNING: Coordinates {geop} outside of continent '{continent.name}' ({p.source})")
-            if route is None:
+            if state.route is None:
                 print(f"WARNING: New PosRecord but no route is active! Will be discarded! ({p.source})")
                 continue
             if geop.is_close(prev_point):
                 continue
-            segment.add_point(geop)
+            state.segment.add_point(geop)
             prev_point = geop
 
         else:
             raise ValueError(f"Unrecognized parsed token <{type(p)}>{p}")
 
-    if segment.geopoints:
-        route.add_segment(segment)
+    if state.segment.geopoints:
+        state.route.add_segment(state.segment)
 
-    return all_roads
+    return state.all_roads
 
 
 def main(opts: Options):
@@ -262,12 +387,21 @@ def main(opts: Options):
         print(f"Output '{output}' exists, reading previous data for merging...")
         targ_dict = load_from(output)
 
-    parsed: list[ChatLine] = []
-    for cf in chat_file:
-        print(f"Parsing {cf}...")
-        parsed.extend(parse(cf, startfrom))
-
-    baked = bake(parsed)
+    def _parse_all() -> Generator[ChatLine, None, None]:
+        if len(chat_file) == 1:
+            print(f"Parsing {chat_file[0]}...")
+            yield from parse(chat_file[0], startfrom)
+            return
+        # Transcripts are independent of each other, so parse them in parallel; imap() still hands the results
+        # back in the order given, which bake() depends on
+        print(f"Parsing {len(chat_file)} files...")
+        with MP.Pool(min(len(chat_file), MP.cpu_count())) as pool:
+            jobs = [(cf, startfrom) for cf in chat_file]
+            for cf, records in zip(chat_file, pool.imap(parse_job, jobs), strict=True):
+                print(f"Parsing {cf}...")
+                yield from records
+
+    baked = bake(_parse_all())
     for conti_name, b_continent in baked.items():
         if conti_name not in targ_dict:
             targ_dict[conti_name] = b_continent
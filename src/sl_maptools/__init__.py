@@ -4,8 +4,10 @@
 from __future__ import annotations
 
 import math
+import os
 import re
 from collections.abc import Generator, Iterable, Iterator
+from itertools import chain, repeat
 from pathlib import Path
 from typing import TYPE_CHECKING, Final, NamedTuple, NotRequired, Protocol, TypedDict
 
@@ -98,9 +100,10 @@ class AreaBounds(NamedTuple):
 
     def xy_iterator(self) -> Generator[CoordType, None, None]:
         """Returns an iterator of the (x, y) coordinate, with x increasing first"""
+        xs = range(min(self.x_westmost, self.x_eastmost), max(self.x_eastmost, self.x_westmost) + 1)
+        # zip() builds each row's tuples in C instead of one Python-level yield per coordinate
         for y in self.y_iterator():
-            for x in self.x_iterator():
-                yield x, y
+            yield from zip(xs, repeat(y))
 
     def intersection(self, other: AreaBounds) -> AreaBounds | None:
         """Returns an AreaBounds containing intersecting coordinates, or None if no intersection"""
@@ -187,20 +190,15 @@ class AreaBoundsSet(Iterable):
 
     def to_coords(self) -> set[CoordType]:
         """Returns a set of coordinates contained in all AreaBounds in the set"""
-        return {(x, y) for area in self.areas for x, y in area.xy_iterator()}
+        return set(chain.from_iterable(area.xy_iterator() for area in self.areas))
 
     def xy_iterator(self) -> Generator[CoordType, None, None]:
         """
         Returns an iterator of the (x, y) coordinate, x increasing first, running over all AreaBounds in the set.
         The coordinates are guaranteed to not be duplicated.
         """
-        _seen = set()
-        xy: CoordType
-        for area in self.areas:
-            for xy in area.xy_iterator():
-                if xy not in _seen:
-                    _seen.add(xy)
-                    yield xy
+        # dict.fromkeys() de-duplicates while keeping first-seen order, all in C
+        yield from dict.fromkeys(chain.from_iterable(area.xy_iterator() for area in self.areas))
 
     def bounding_box(self) -> AreaBounds:
         """Returns an AreaBounds that exactly contains all areas in the set"""
@@ -440,16 +438,27 @@ class SupportsSet(Protocol):  # noqa: D101
         ...
 
 
+def _list_maptile_names(mapdir: Path, *, reverse: bool = False) -> list[str]:
+    """
+    Returns the sorted names of the '*.jp*' files in mapdir.
+
+    A single scandir() pass that sorts plain strings; much cheaper than glob() + sorting Path objects when the
+    directory holds hundreds of thousands of tiles.
+    """
+    with os.scandir(mapdir) as entries:
+        return sorted((e.name for e in entries if ".jp" in e.name), reverse=reverse)
+
+
 def inventorize_maps_latest(mapdir: Path | str) -> dict[CoordType, Path]:
     """Makes a dict of all available map tiles, by region coords"""
     mapdir = Path(mapdir)
     rslt: dict[CoordType, Path] = {}
-    for fp in sorted(mapdir.glob("*.jp*"), reverse=True):
-        if (m := RE_MAPFILE.match(fp.name)) is None:
+    for name in _list_maptile_names(mapdir, reverse=True):
+        if (m := RE_MAPFILE.match(name)) is None:
             continue
         coord = int(m.group("x")), int(m.group("y"))
         if coord not in rslt:
-            rslt[coord] = fp
+            rslt[coord] = mapdir / name
     return rslt
 
 
@@ -462,9 +471,9 @@ def inventorize_maps_all(mapdir: Path | str) -> dict[CoordType, list[Path]]:
     """
     mapdir: Path = Path(mapdir)
     rslt: dict[CoordType, list[Path]] = {}
-    for fp in sorted(mapdir.glob("*.jp*")):
-        if (m := RE_MAPFILE.match(fp.name)) is None:
+    for name in _list_maptile_names(mapdir):
+        if (m := RE_MAPFILE.match(name)) is None:
             continue
         coord = int(m.group("x")), int(m.group("y"))
-        rslt.setdefault(coord, []).append(fp)
+        rslt.setdefault(coord, []).append(mapdir / name)
     return rslt
@@ -21,6 +21,9 @@ DO_NOT_MAP_AREAS: Final[dict[str, AreaBounds]] = {
 
 KNOWN_AREAS: Final[dict[str, AreaDescriptor]] = {}
 
+KNOWN_AREAS_CASEFOLDED: Final[dict[str, str]] = {}
+"""Casefolded names of KNOWN_AREAS, mapped to their actual names. Kept in sync by read_known_areas()"""
+
 
 CoordBounds = list[str | list[int]]
 
@@ -39,6 +42,7 @@ class AreaDef(TypedDict):
 def read_known_areas(yaml_file: Path) -> None:
     """Read a YAML file and put the contents in KNOWN_AREAS"""
     KNOWN_AREAS.clear()
+    KNOWN_AREAS_CASEFOLDED.clear()
     _data: dict[str, AreaDef]
     with yaml_file.open("rt") as fin:
         _data = YAML(typ="safe").load(fin)
@@ -55,6 +59,7 @@ def read_known_areas(yaml_file: Path) -> None:
         _excs = {_to_abounds(i) for i in _d.get("excludes", [])}
         _pragma = _d.get("pragma")
         KNOWN_AREAS[_n] = AreaDescriptor(includes=_incs, excludes=_excs, name=_n, pragma=_pragma)
+        KNOWN_AREAS_CASEFOLDED[_n.casefold()] = _n
 
 
 read_known_areas(Path(__file__).with_suffix(".yaml"))
@@ -6,10 +6,11 @@ from __future__ import annotations
 import shutil
 import signal
 import time
-from contextlib import contextmanager
+from contextlib import contextmanager, suppress
 from datetime import datetime
 from typing import IO, TYPE_CHECKING
 
+from PIL import Image
 from PIL.PngImagePlugin import PngInfo
 
 if TYPE_CHECKING:
@@ -34,7 +35,8 @@ def make_backup(the_file: Path, levels: int = 2) -> None:
     for n in range(levels, 0, -1):
         prev_n = the_file.with_suffix(f".prev{n}{suff}")
         prev_b = the_file.with_suffix(f".prev{n - 1}{suff}")
-        if prev_b.exists():
+        # Just attempt the rename; a missing level costs one failed syscall instead of a stat() plus the rename
+        with suppress(FileNotFoundError):
             prev_b.replace(prev_n)
 
 
@@ -83,6 +85,20 @@ def handle_sigint(interrupt_flag: SupportsSet) -> None:
     signal.signal(signal.SIGINT, orig_sigint)
 
 
+@contextmanager
+def image_pixel_limit(max_pixels: int | None) -> None:
+    """
+    A context manager that raises PIL's decompression-bomb limit to max_pixels (None = no limit), and restores the
+    original limit upon exit
+    """
+    orig_limit = Image.MAX_IMAGE_PIXELS
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    try:
+        yield
+    finally:
+        Image.MAX_IMAGE_PIXELS = orig_limit
+
+
 def make_pnginfo(title: str, description: str, info: InfoConfig) -> PngInfo:
     """Make metadata suitable for injection into a PNG file"""
     author = info.author
@@ -173,8 +173,9 @@ def get_bonnie_coords(config: BonnieConfig, *, maxage: timedelta | int | None =
         age = datetime.now() - datetime.fromtimestamp(bonniedb.stat().st_mtime)  # noqa: DTZ005, DTZ006
         if age < maxage:
             print("loading ... ", end="", flush=True)
+            # The DB is big and is only read here, so let ruamel use its C parser (ruamel.yaml.clib) when installed
             with bonniedb.open("rt") as fin:
-                bdb_data_raw = yml.load(fin)
+                bdb_data_raw = ryaml.YAML(typ="safe").load(fin)
         else:
             print("older than maxage.")
     if not bdb_data_raw:
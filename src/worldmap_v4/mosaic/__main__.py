@@ -99,15 +99,11 @@ def main(opts: OptionsType) -> None:  # noqa: D103
         with regdb_p.open("rb") as fin:
             regions_db = pickle.load(fin)  # noqa: S301
     if regions_db:
-        for k in list(mapfiles_d.keys()):
-            if k not in regions_db or regions_db[k]["current_name"] == "":
-                del mapfiles_d[k]
+        mapfiles_d = {k: v for k, v in mapfiles_d.items() if k in regions_db and regions_db[k]["current_name"] != ""}
     #
     if not opts.no_bonnie:
         bonnie_coords = get_bonnie_coords(Config.bonnie)
-        for k in list(mapfiles_d.keys()):
-            if k not in bonnie_coords:
-                del mapfiles_d[k]
+        mapfiles_d = {k: v for k, v in mapfiles_d.items() if k in bonnie_coords}
 
     # fmt: off
     # Grab only files that are not yet analyzed
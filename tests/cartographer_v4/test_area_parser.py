@@ -0,0 +1,73 @@
+import argparse
+from itertools import product
+
+import pytest
+
+from cartographer_v4.__main__ import AreaParser
+from sl_maptools import AreaBounds
+
+
+def regex_parse(value: str) -> AreaBounds | None:
+    """What AreaParser used to do for every value: match RE_AREA, then put the corners in order"""
+    m = AreaParser.RE_AREA.match(value)
+    if m is None:
+        return None
+    x1, y1, x2, y2 = (int(m.group(g)) for g in ("x1", "y1", "x2", "y2"))
+    return AreaBounds(min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+
+
+def area_parse(value: str) -> AreaBounds | None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("areas", action=AreaParser, nargs="*")
+    try:
+        # '--' so that values starting with '-' aren't taken for options
+        (rslt,) = parser.parse_args(["--", value]).areas
+    except SystemExit:
+        return None
+    return rslt
+
+
+SEPARATORS = ",:-"
+
+values = [
+    # Every combination of separators, so the fast path sees all of them
+    *(f"1000{s1}1001{s2}1010{s3}1011" for s1, s2, s3 in product(SEPARATORS, repeat=3)),
+    # Corners given the "wrong" way round
+    "1010,1011-1000,1001",
+    "1010,1001-1000,1011",
+    # Leading zeroes and non-ASCII digits
+    "0999,01000-1001,1002",
+    "\u0661\u0660\u0660\u0660,1000,1001,1001",
+    # Whitespace
+    " 1000,1000-1001,1001",
+    "1000,1000-1001,1001 ",
+    "1000, 1000-1001,1001",
+    "1000,1000 - 1001,1001",
+    "1000,1000-1001,1001\n",
+    # Negative and empty parts
+    "-1000,1000-1001,1001",
+    "1000,-1000-1001,1001",
+    "1000,1000--1001,1001",
+    "1000,,1000,1001",
+    ",1000,1001,1001",
+    "1000,1000,1001,",
+    ",,,",
+    "",
+    # Malformed
+    "1000,1000,1001",
+    "1000,1000,1001,1001,1002",
+    "1000,1000-1001,1001x",
+    "1000.5,1000-1001,1001",
+    "1000;1000;1001;1001",
+    "a,b,c,d",
+    "1000,1000-1001,0x10",
+]
+
+
+@pytest.mark.parametrize("value", values)
+def test_area_parser_same_as_regex(value: str):
+    assert area_parse(value) == regex_parse(value)
+
+
+def test_area_parser_accepts_both_forms():
+    assert area_parse("1000,1001-1010,1011") == area_parse("1000,1001,1010,1011") == AreaBounds(1000, 1001, 1010, 1011)
@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import pytest
+
+from cartographer_v4.__main__ import select_tiles
+from cartographer_v4.lattice import ExclusionMethod
+from sl_maptools import AreaBounds, AreaDescriptor, CoordType
+
+# A sparse patch of tiles, with holes, and a validation set that leaves out some of them
+MAP_TILES: dict[CoordType, Path] = {
+    (x, y): Path(f"{x}-{y}_240101-0000.jpg") for x in range(998, 1014) for y in range(998, 1012) if (x * 7 + y) % 5
+}
+VALIDATION_SET: set[CoordType] = {xy for xy in MAP_TILES if (xy[0] + xy[1] * 3) % 4}
+
+
+def loop_select(area: AreaDescriptor, exclusion_method: ExclusionMethod) -> list[CoordType]:
+    """The per-coordinate loop make_map() used to run"""
+    if exclusion_method is ExclusionMethod.HIDE:
+        xy_iterator = area.xy_iterator
+    else:
+        xy_iterator = area.bounding_box.xy_iterator
+    rslt = []
+    for x, y in xy_iterator():
+        if (x, y) not in MAP_TILES:
+            continue
+        if area.validate and (x, y) not in VALIDATION_SET:
+            continue
+        rslt.append((x, y))
+    return rslt
+
+
+area_params = [
+    pytest.param(AreaDescriptor(includes=AreaBounds(1000, 1000, 1007, 1006)), id="simple"),
+    pytest.param(
+        AreaDescriptor(
+            includes=[AreaBounds(1000, 1000, 1007, 1006), AreaBounds(1005, 1004, 1011, 1009)],
+            excludes=AreaBounds(1002, 1002, 1003, 1003),
+        ),
+        id="overlapping-with-exclusion",
+    ),
+    pytest.param(
+        AreaDescriptor(includes=[AreaBounds(999, 999, 1001, 1001), AreaBounds(1008, 1006, 1010, 1008)]),
+        id="disjoint",
+    ),
+    pytest.param(
+        AreaDescriptor(includes=AreaBounds(1001, 1001, 1010, 1008), pragma={"validate": False}),
+        id="no-validate",
+    ),
+    pytest.param(AreaDescriptor(includes=AreaBounds(2000, 2000, 2003, 2003)), id="no-tiles"),
+]
+
+
+@pytest.mark.parametrize("exclusion_method", list(ExclusionMethod))
+@pytest.mark.parametrize("area", area_params)
+def test_select_tiles(area: AreaDescriptor, exclusion_method: ExclusionMethod):
+    rslt = select_tiles(area, MAP_TILES, VALIDATION_SET, exclusion_method)
+    expected = loop_select(area, exclusion_method)
+    assert sorted(rslt) == sorted(expected)
+    assert len(rslt) == len(set(rslt))
+    # Canvas row order: north to south, then west to east
+    assert rslt == sorted(expected, key=lambda xy: (-xy[1], xy[0]))
@@ -0,0 +1,185 @@
+from pathlib import Path
+
+import pytest
+
+from roadmapper_v3.model import SegmentMode
+from roadmapper_v3.parser.chat import ChatCommand, PosRecord, bake, parse
+from sl_maptools.colors import ALL_COLORS
+
+TRANSCRIPT = """\
+[2024/03/05 09:00]  Someone: hello there
+[2024/03/05 10:01]  PosRecorder v2: # Recording begins
+[2024/03/05 10:02]  PosRecorder v2: continent: Bellisseria_ALL
+[2024/03/05 10:02]  Bob: where do I get a PosRecorder?
+[2024/03/05 10:03]  PosRecorder v2: route: Road 0
+[2024/03/05 10:04]  PosRecorder v2: frobnicate: 1, 2, 3
+
+[2024/03/05 10:05]  PosRecorder v2: solid
+[2024/03/05 10:06]  PosRecorder v2: 3;;Reg 1030;;Parcel 0;;<263680, 240640, 0>;;<66.33415, 37.54246, 22.00000>
+PosRecorder v2: 3;;Reg 1030;;Parcel 1;;<263680, 240640, 0>;;<94.11685, 21.16427, 22.00000>
+[2024-03-05 11:07:30]  PosRecorder v2: 3;;Reg 1031;;Parcel 2;;<263936, 240640, 0>;;<3.17891, 33.09160, 22.00000>
+[2024/03/05 11:08]  PosRecorder v2: ENDROUTE
+"""
+
+# (line number, kind, payload); payload is (command, args) for commands and the parcel name for PosRecords
+EXPECTED = [
+    (3, ChatCommand, ("continent", "Bellisseria_ALL")),
+    (5, ChatCommand, ("route", "Road 0")),
+    (6, ChatCommand, ("frobnicate", "1, 2, 3")),
+    (8, ChatCommand, ("solid", "")),
+    (9, PosRecord, "Parcel 0"),
+    (10, PosRecord, "Parcel 1"),
+    (11, PosRecord, "Parcel 2"),
+    (12, ChatCommand, ("endroute", "")),
+]
+
+
+def _summarize(records: list[ChatCommand | PosRecord]) -> list[tuple[int, type, object]]:
+    rslt = []
+    for rec in records:
+        if isinstance(rec, PosRecord):
+            rslt.append((rec.source_line, PosRecord, rec.parcel_name))
+        else:
+            rslt.append((rec.source_line, ChatCommand, (rec.command, rec.args)))
+    return rslt
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"], ids=["LF", "CRLF"])
+def test_parse(tmp_path: Path, newline: str):
+    chat_file = tmp_path / "chat.txt"
+    chat_file.write_bytes(TRANSCRIPT.replace("\n", newline).encode("utf-8"))
+    assert _summarize(list(parse(chat_file, ""))) == EXPECTED
+
+
+def test_parse_posrecord(tmp_path: Path):
+    chat_file = tmp_path / "chat.txt"
+    chat_file.write_text(TRANSCRIPT, encoding="utf-8")
+    rec = [r for r in parse(chat_file, "") if isinstance(r, PosRecord)][-1]
+    assert rec.source_path == chat_file
+    assert rec.region_name == "Reg 1031"
+    assert rec.region_corner == (263936.0, 240640.0, 0.0)
+    assert rec.pos_local == (3.17891, 33.09160, 22.0)
+    assert rec.to_point() == (263939.17891, 240673.0916)
+
+
+@pytest.mark.parametrize(
+    "startfrom, first_line",
+    [
+        pytest.param("2024/03/05 10:04", 6, id="minute"),
+        pytest.param("2024-03-05 11:07:30", 10, id="seconds"),
+        pytest.param("20240305 1108", 12, id="compact"),
+        pytest.param("2024/03/06 00:00", 13, id="after-all"),
+    ],
+)
+def test_parse_startfrom(tmp_path: Path, startfrom: str, first_line: int):
+    chat_file = tmp_path / "chat.txt"
+    chat_file.write_text(TRANSCRIPT, encoding="utf-8")
+    # Lines without a timestamp can't be placed in time, so they are never filtered out
+    expected = [e for e in EXPECTED if e[0] >= first_line or e[0] == 10]
+    assert _summarize(list(parse(chat_file, startfrom))) == expected
+
+
+def test_parse_bad_startfrom(tmp_path: Path):
+    chat_file = tmp_path / "chat.txt"
+    chat_file.write_text(TRANSCRIPT, encoding="utf-8")
+    with pytest.raises(ValueError, match="Unrecognized timestamp"):
+        list(parse(chat_file, "yesterday"))
+
+
+def test_parse_missing_file(tmp_path: Path):
+    with pytest.raises(FileNotFoundError):
+        list(parse(tmp_path / "nope.txt", ""))
+
+
+def _posrec(x: float, y: float) -> str:
+    return f"PosRecorder v2: 3;;Reg 1030;;Parcel;;<263680, 240640, 0>;;<{x}, {y}, 22.0>"
+
+
+BAKE_TRANSCRIPT = [
+    "PosRecorder v2: continent: Bellisseria_ALL",
+    "PosRecorder v2: route: Road A",
+    "PosRecorder v2: color: bq10-2",
+    _posrec(10, 10),
+    _posrec(20, 10),
+    "PosRecorder v2: dashed",
+    _posrec(30, 10),
+    _posrec(40, 10),
+    "PosRecorder v2: segdesc: bridge",
+    "PosRecorder v2: mode: RAILS",
+    _posrec(50, 10),
+    _posrec(60, 10),
+    "PosRecorder v2: arc",
+    "PosRecorder v2: pos",
+    _posrec(70, 10),
+    _posrec(80, 20),
+    "PosRecorder v2: # comments between arc points are fine",
+    _posrec(90, 10),
+    _posrec(100, 10),
+    _posrec(110, 10),
+    "PosRecorder v2: break",
+    _posrec(120, 10),
+    _posrec(130, 10),
+    "PosRecorder v2: route: Road B",
+    "PosRecorder v2: color: 1, 2, 3",
+    _posrec(10, 50),
+    _posrec(20, 50),
+    "PosRecorder v2: route: *DISCARD* detour",
+    _posrec(10, 70),
+    _posrec(20, 70),
+    "PosRecorder v2: route: Road A",
+    _posrec(10, 90),
+    _posrec(20, 90),
+]
+
+
+def _geo(*local: tuple[float, float]) -> list[tuple[float, float]]:
+    return [(263680 + x, 240640 + y) for x, y in local]
+
+
+def test_bake(tmp_path: Path):
+    chat_file = tmp_path / "chat.txt"
+    chat_file.write_text("\n".join(BAKE_TRANSCRIPT) + "\n", encoding="utf-8")
+    roads = bake(parse(chat_file, ""))
+
+    assert list(roads) == ["Bellisseria_ALL"]
+    continent = roads["Bellisseria_ALL"]
+    assert list(continent.routes) == ["Road A", "Road B"]
+
+    road_a = continent["Road A"]
+    assert road_a.color == ALL_COLORS["bq10-2"]
+    assert [(seg.mode, seg.desc, seg.geopoints) for seg in road_a.segments] == [
+        (SegmentMode.SOLID, None, _geo((10, 10), (20, 10))),
+        (SegmentMode.DASHED, "bridge", _geo((30, 10), (40, 10))),
+        (SegmentMode.RAILS, None, _geo((50, 10), (60, 10))),
+        (SegmentMode.ARC, None, _geo((70, 10), (80, 20), (90, 10))),
+        (SegmentMode.SOLID, None, _geo((100, 10), (110, 10))),
+        (SegmentMode.SOLID, None, _geo((120, 10), (130, 10))),
+        (SegmentMode.SOLID, None, _geo((10, 90), (20, 90))),
+    ]
+
+    road_b = continent["Road B"]
+    assert road_b.color == (1, 2, 3)
+    assert [(seg.mode, seg.geopoints) for seg in road_b.segments] == [(SegmentMode.SOLID, _geo((10, 50), (20, 50)))]
+
+
+@pytest.mark.parametrize(
+    "color, expected",
+    [
+        pytest.param("bq10-4", ALL_COLORS["bq10-4"], id="named"),
+        pytest.param("10;20;30", (10, 20, 30), id="rgb"),
+        pytest.param("10, 20, 300", None, id="out-of-range"),
+        pytest.param("10, 20, x", None, id="not-a-number"),
+        pytest.param("no-such-color", None, id="unknown-name"),
+    ],
+)
+def test_bake_color(tmp_path: Path, color: str, expected: tuple[int, int, int] | None):
+    chat_file = tmp_path / "chat.txt"
+    chat_file.write_text("\n".join(BAKE_TRANSCRIPT[:2] + [f"PosRecorder v2: color: {color}"]) + "\n", encoding="utf-8")
+    assert bake(parse(chat_file, ""))["Bellisseria_ALL"]["Road A"].color == expected
+
+
+def test_bake_bad_mode(tmp_path: Path):
+    chat_file = tmp_path / "chat.txt"
+    chat_file.write_text("\n".join(BAKE_TRANSCRIPT[:2] + ["PosRecorder v2: mode: WIGGLY"]) + "\n", encoding="utf-8")
+    with pytest.raises(KeyError, match="WIGGLY"):
+        bake(parse(chat_file, ""))
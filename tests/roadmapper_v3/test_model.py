@@ -0,0 +1,89 @@
+from argparse import Namespace
+from pathlib import Path
+
+from ruamel.yaml import YAML
+
+from roadmapper_v3.model import Point, Route, Segment, SegmentMode
+from roadmapper_v3.model.yaml import load_from
+from roadmapper_v3.parser import chat
+
+# A segment that goes round a block and then carries on through its starting point again
+LOOP = [(263700.0, 240700.0), (263750.0, 240700.0), (263750.0, 240750.0), (263700.0, 240700.0), (263800.0, 240700.0)]
+# What the code used to store for LOOP: every revisited point dropped
+LOOP_LEGACY = [(263700.0, 240700.0), (263750.0, 240700.0), (263750.0, 240750.0), (263800.0, 240700.0)]
+
+
+def test_add_point_keeps_revisits():
+    seg = Segment()
+    for p in LOOP:
+        seg.add_point(Point(*p))
+    assert seg.geopoints == LOOP
+
+
+def test_add_point_drops_adjacent_repeat():
+    seg = Segment()
+    for p in ((263700.0, 240700.0), (263700.2, 240700.3), (263750.0, 240700.0)):
+        seg.add_point(Point(*p))
+    assert seg.geopoints == [(263700.0, 240700.0), (263750.0, 240700.0)]
+
+
+def test_add_points_same_as_add_point():
+    pts = LOOP[:2] + LOOP[1:] + LOOP[-1:]
+    seg1 = Segment()
+    for p in pts:
+        seg1.add_point(Point(*p))
+    seg2 = Segment()
+    seg2.add_points(pts[:3])
+    seg2.add_points(pts[3:])
+    assert seg1.geopoints == seg2.geopoints == LOOP
+
+
+def test_route_matches_legacy_segment():
+    legacy = Segment()
+    legacy.add_points(LOOP_LEGACY)
+    route = Route("Road")
+    route.add_segment(legacy)
+
+    looping = Segment()
+    looping.add_points(LOOP)
+    assert looping.as_inttuple() != legacy.as_inttuple()
+    assert looping in route
+
+    other = Segment(SegmentMode.DASHED)
+    other.add_points(LOOP[1:])
+    assert other not in route
+
+
+def test_remerge_legacy_yaml(tmp_path: Path):
+    roads = tmp_path / "roads.yaml"
+    legacy = {
+        "version": 2,
+        "road_data": {
+            "Bellisseria_ALL": {
+                "Road 0": {
+                    "color": [10, 200, 30],
+                    "segments": [{"mode": "SOLID", "desc": None, "width": None, "geo_points": LOOP_LEGACY}],
+                },
+            },
+        },
+    }
+    with roads.open("wt", encoding="utf-8") as fout:
+        YAML(typ="safe", pure=True).dump(legacy, fout)
+
+    lines = [
+        "[2024/03/05 10:02]  PosRecorder v2: continent: Bellisseria_ALL",
+        "[2024/03/05 10:03]  PosRecorder v2: route: Road 0",
+        "[2024/03/05 10:04]  PosRecorder v2: color: 10, 200, 30",
+    ]
+    for x, y in LOOP:
+        lines.append(
+            f"[2024/03/05 10:05]  PosRecorder v2: 3;;Reg;;Parcel;;<263680, 240640, 0>;;<{x - 263680}, {y - 240640}, 22>"
+        )
+    transcript = tmp_path / "chat.txt"
+    transcript.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    chat.main(Namespace(output=roads, chat_file=[transcript], startfrom=""))
+
+    route = load_from(roads)["Bellisseria_ALL"]["Road 0"]
+    assert len(route.segments) == 1
+    assert route.segments[0].geopoints == LOOP_LEGACY
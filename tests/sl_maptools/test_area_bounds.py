@@ -0,0 +1,56 @@
+from collections.abc import Iterator
+
+import pytest
+
+from sl_maptools import AreaBounds, AreaBoundsSet, CoordType
+
+
+def loop_xy(area: AreaBounds) -> Iterator[CoordType]:
+    """Plain nested loop, the way xy_iterator() used to be written"""
+    for y in area.y_iterator():
+        for x in area.x_iterator():
+            yield x, y
+
+
+def loop_xy_set(areas: AreaBoundsSet) -> Iterator[CoordType]:
+    seen = set()
+    for area in areas:
+        for xy in loop_xy(area):
+            if xy not in seen:
+                seen.add(xy)
+                yield xy
+
+
+bounds_params = [
+    pytest.param(AreaBounds(1000, 1000, 1000, 1000), id="single"),
+    pytest.param(AreaBounds(1000, 1000, 1004, 1002), id="wide"),
+    pytest.param(AreaBounds(1000, 1000, 1001, 1005), id="tall"),
+    pytest.param(AreaBounds(1004, 1002, 1000, 1000), id="reversed"),
+]
+
+bounds_set_params = [
+    pytest.param([AreaBounds(1000, 1000, 1004, 1004)], id="one"),
+    pytest.param([AreaBounds(1000, 1000, 1004, 1004), AreaBounds(1002, 1003, 1008, 1006)], id="overlapping"),
+    pytest.param([AreaBounds(1000, 1000, 1004, 1004), AreaBounds(1001, 1001, 1002, 1002)], id="nested"),
+    pytest.param([AreaBounds(1000, 1000, 1002, 1002), AreaBounds(1010, 1010, 1012, 1011)], id="disjoint"),
+    pytest.param([AreaBounds(1000, 1000, 1002, 1002), AreaBounds(1003, 1000, 1005, 1002)], id="adjacent"),
+]
+
+
+@pytest.mark.parametrize("area", bounds_params)
+def test_xy_iterator(area: AreaBounds):
+    assert list(area.xy_iterator()) == list(loop_xy(area))
+
+
+@pytest.mark.parametrize("areas", bounds_set_params)
+def test_set_xy_iterator(areas: list[AreaBounds]):
+    abs_ = AreaBoundsSet(areas)
+    rslt = list(abs_.xy_iterator())
+    assert rslt == list(loop_xy_set(abs_))
+    assert len(rslt) == len(set(rslt))
+
+
+@pytest.mark.parametrize("areas", bounds_set_params)
+def test_set_to_coords(areas: list[AreaBounds]):
+    abs_ = AreaBoundsSet(areas)
+    assert abs_.to_coords() == set(loop_xy_set(abs_))
@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import pytest
+
+from sl_maptools import RE_MAPFILE, CoordType, _list_maptile_names, inventorize_maps_all, inventorize_maps_latest
+
+FILES = [
+    "1000-1000_240101-0000.jpg",
+    "1000-1000_240301-1200.jpg",
+    "1000-1000_240201-0600.jpeg",
+    "1001-1000_240101-0000.jpg",
+    "1001-1000_240101-0000.jpg.bak",
+    "1002-1001_240101-0000.JPG",
+    "1002-1001_231231-2359.Jpeg",
+    "1003-1001_240101-0000.jPg",
+    ".1004-1001_240101-0000.jpg",
+    ".jpg",
+    "1005-1001_240101-0000.png",
+    "1005-1001_240101-0000.jp",
+    "1005-1002.jpg",
+    "notes.txt",
+    "README",
+    "x.jpx",
+]
+DIRS = [
+    "1006-1002_240101-0000.jpg",
+    "subdir",
+    "old.jpeg",
+    ".cache.jpg",
+]
+
+
+@pytest.fixture
+def mapdir(tmp_path: Path) -> Path:
+    for name in FILES:
+        (tmp_path / name).write_bytes(b"")
+    for name in DIRS:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "1007-1002_240101-0000.jpg").write_bytes(b"")
+    return tmp_path
+
+
+def glob_latest(mapdir: Path) -> dict[CoordType, Path]:
+    """inventorize_maps_latest() as it was written before it switched to scandir()"""
+    rslt: dict[CoordType, Path] = {}
+    for fp in sorted(mapdir.glob("*.jp*"), reverse=True):
+        if (m := RE_MAPFILE.match(fp.name)) is None:
+            continue
+        coord = int(m.group("x")), int(m.group("y"))
+        if coord not in rslt:
+            rslt[coord] = fp
+    return rslt
+
+
+def glob_all(mapdir: Path) -> dict[CoordType, list[Path]]:
+    """inventorize_maps_all() as it was written before it switched to scandir()"""
+    rslt: dict[CoordType, list[Path]] = {}
+    for fp in sorted(mapdir.glob("*.jp*")):
+        if (m := RE_MAPFILE.match(fp.name)) is None:
+            continue
+        coord = int(m.group("x")), int(m.group("y"))
+        rslt.setdefault(coord, []).append(fp)
+    return rslt
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_list_maptile_names(mapdir: Path, reverse: bool):
+    expected = [fp.name for fp in sorted(mapdir.glob("*.jp*"), reverse=reverse)]
+    assert _list_maptile_names(mapdir, reverse=reverse) == expected
+
+
+def test_inventorize_maps_latest(mapdir: Path):
+    rslt = inventorize_maps_latest(mapdir)
+    assert list(rslt.items()) == list(glob_latest(mapdir).items())
+    assert rslt[1000, 1000] == mapdir / "1000-1000_240301-1200.jpg"
+
+
+def test_inventorize_maps_all(mapdir: Path):
+    rslt = inventorize_maps_all(str(mapdir))
+    assert list(rslt.items()) == list(glob_all(mapdir).items())
+    assert rslt[1000, 1000] == [
+        mapdir / "1000-1000_240101-0000.jpg",
+        mapdir / "1000-1000_240201-0600.jpeg",
+        mapdir / "1000-1000_240301-1200.jpg",
+    ]